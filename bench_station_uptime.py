@@ -0,0 +1,133 @@
+import argparse
+import mmap
+import os
+import pickle
+import random
+import tempfile
+import time
+from unittest import mock
+
+import station_uptime
+from station_uptime import StationUptimeCalculator
+
+def build_shared_topology(stations: int, chargers: int, chargers_per_station: int,
+                          reports_per_charger: int, seed: int = 0) -> StationUptimeCalculator:
+    """
+    Builds a calculator whose stations draw their chargers from a small shared pool,
+    so every charger is listed by many stations (shared power cabinets).
+    
+    Args:
+        stations: Number of stations
+        chargers: Size of the shared charger pool
+        chargers_per_station: Chargers listed by each station
+        reports_per_charger: Alternating up/down reports generated per charger
+        seed: Random seed for reproducible inputs
+        
+    Returns:
+        Calculator populated with the synthetic stations and reports
+    """
+    rng = random.Random(seed)
+    calculator = StationUptimeCalculator()
+    for station_id in range(stations):
+        calculator.station_chargers[station_id] = set(rng.sample(range(chargers), chargers_per_station))
+    for charger_id in range(chargers):
+        time_cursor = 0
+        for i in range(reports_per_charger):
+            duration = rng.randint(1, 1000)
+            calculator._add_report(charger_id, time_cursor, time_cursor + duration, i % 3 != 0)
+            time_cursor += rng.randint(0, duration)
+    return calculator
+
+def bench_shared_chargers(args: argparse.Namespace) -> None:
+    """
+    Times calculate_station_uptime on a heavily shared topology and counts how
+    many charger timelines were swept.
+    """
+    calculator = build_shared_topology(args.stations, args.chargers, args.chargers_per_station,
+                                       args.reports_per_charger)
+    references = sum(len(charger_ids) for charger_ids in calculator.station_chargers.values())
+    sweep = station_uptime._sweep_charger_reports
+    with mock.patch.object(station_uptime, '_sweep_charger_reports', side_effect=sweep) as counted:
+        started = time.perf_counter()
+        calculator.calculate_station_uptime()
+        elapsed = time.perf_counter() - started
+
+    print(f"shared chargers: {args.stations} stations, {args.chargers} chargers, "
+          f"{references} station-charger references, {args.reports_per_charger} reports/charger")
+    print(f"  calculate_station_uptime: {elapsed:.3f}s, timelines swept: {counted.call_count}")
+
+def write_report_file(path: str, lines: int, chargers: int, seed: int = 0) -> None:
+    """
+    Writes a synthetic input file with `lines` time-ordered reports spread over
+    `chargers` chargers, ten chargers per station.
+    """
+    rng = random.Random(seed)
+    cursors = [0] * chargers
+    with open(path, 'w') as f:
+        f.write("[Stations]\n")
+        for station_id in range(0, chargers, 10):
+            charger_ids = range(station_id, min(station_id + 10, chargers))
+            f.write(" ".join(str(value) for value in [station_id, *charger_ids]) + "\n")
+        f.write("\n[Charger Availability Reports]\n")
+        for _ in range(lines):
+            charger_id = rng.randrange(chargers)
+            start = cursors[charger_id]
+            cursors[charger_id] = end = start + rng.randint(1, 100000)
+            f.write(f"{charger_id} {start} {end} {'true' if rng.random() < 0.7 else 'false'}\n")
+
+def bench_parallel_parse(args: argparse.Namespace) -> None:
+    """
+    Times the parts of a parallel parse: the worker function over the whole
+    reports section, the pickle round trip of its result, and the merge in the
+    parent, which is the serial part. Then times complete parses per worker count.
+    """
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    try:
+        write_report_file(path, args.parse_lines, args.parse_chargers)
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                _, _, reports_start = station_uptime._find_section_offsets(mm)
+                size = len(mm)
+
+        started = time.perf_counter()
+        partial = station_uptime._parse_report_chunk(path, reports_start, size)
+        worker = time.perf_counter() - started
+        started = time.perf_counter()
+        partial = pickle.loads(pickle.dumps(partial))
+        transfer = time.perf_counter() - started
+        calculator = StationUptimeCalculator(columnar=True)
+        started = time.perf_counter()
+        calculator._merge_partial(partial)
+        merge = time.perf_counter() - started
+
+        print(f"parallel parse: {args.parse_lines} lines, {size / 2 ** 20:.1f} MiB, {os.cpu_count()} CPUs")
+        print(f"  worker {worker:.2f}s, pickle round trip {transfer:.2f}s, parent merge {merge:.2f}s")
+        for workers in args.parse_workers:
+            calculator = StationUptimeCalculator()
+            started = time.perf_counter()
+            calculator.parse_input_file(path, use_mmap=True, workers=workers)
+            print(f"  workers={workers}: {time.perf_counter() - started:.2f}s")
+    finally:
+        os.remove(path)
+
+def main():
+    """
+    Runs the benchmarks with the sizes given on the command line.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the station uptime calculator.")
+    parser.add_argument('--stations', type=int, default=2000)
+    parser.add_argument('--chargers', type=int, default=200)
+    parser.add_argument('--chargers-per-station', type=int, default=20)
+    parser.add_argument('--reports-per-charger', type=int, default=2000)
+    parser.add_argument('--parse-lines', type=int, default=0,
+                        help="Also benchmark parallel parsing of a file with this many report lines")
+    parser.add_argument('--parse-chargers', type=int, default=20000)
+    parser.add_argument('--parse-workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+    bench_shared_chargers(args)
+    if args.parse_lines:
+        bench_parallel_parse(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,74 @@
+from abc import ABC, abstractmethod
+import argparse
+from bisect import bisect_left, bisect_right
+import bz2
+import gzip
+import lzma
+import mmap
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import hashlib
+import heapq
+import io
+import os
+import re
+import struct
 import sys
-from typing import List, Dict, Set, Tuple
+import zlib
+from itertools import islice, repeat
+from typing import BinaryIO, Callable, List, Dict, Set, Sequence, Tuple, Iterable, Iterator, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional; VectorizedUptimeCalculator falls back to pure Python without it
+    np = None
+
+# Section headers of the input file format
+STATIONS_HEADER = '[Stations]'
+REPORTS_HEADER = '[Charger Availability Reports]'
+
+# Parser states
+_PREAMBLE, _STATIONS, _REPORTS = range(3)
+
+# Command line input path meaning "read from stdin"
+STDIN_PATH = '-'
+
+# Files at least this large are parsed through the memory-mapped reader by default
+MMAP_THRESHOLD_BYTES = 4 * 1024 * 1024
+
+# Reports sections smaller than this per worker are not worth splitting across processes
+MIN_PARALLEL_CHUNK_BYTES = 4 * 1024 * 1024
+
+# The memory-mapped reader tokenizes the reports section in blocks of about this size
+REPORT_BLOCK_BYTES = 4 * 1024 * 1024
+
+# Magic numbers of compressed input formats and the stdlib opener for each
+_COMPRESSION_MAGIC = (
+    (b'\x1f\x8b', gzip.open),
+    (b'BZh', bz2.open),
+    (b'\xfd7zXZ\x00', lzma.open),
+)
+
+# Compiled snapshot format (see StationUptimeCalculator.write_snapshot)
+SNAPSHOT_MAGIC = b'SUPTSNAP'
+SNAPSHOT_VERSION = 1
+# magic, version, station/member/charger/report counts, station/member/charger/report offsets
+_SNAPSHOT_HEADER = struct.Struct('<8sI4xQQQQQQQQ')
+# Station or charger table entry: ID, index of its first member/report, member/report count
+_SNAPSHOT_ENTRY = struct.Struct('<qQQ')
+
+# Default size bound of the parsed-input cache directory
+DEFAULT_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+# Header lines as matched on raw bytes: the exact line, except that whitespace at the
+# very start and end of the file is ignored (the original parser stripped the whole file)
+_STATIONS_HEADER_RE = re.compile(rb'(?:^|\A\s*)\[Stations\]\r?$', re.MULTILINE)
+_REPORTS_HEADER_RE = re.compile(rb'(?:^|\A\s*)\[Charger Availability Reports\](?:\r?$|\s*\Z)', re.MULTILINE)
+
+# Per-charger report columns returned by worker processes: (start times, end times, up flags)
+ReportColumns = Tuple[Sequence[int], Sequence[int], bytearray]
 
 class ChargerReport:
     """
@@ -12,112 +81,2104 @@ class ChargerReport:
         self.end_time = end_time        # End time of the reporting period
         self.is_up = is_up              # True if charger was up during this period, False if down
 
-class StationUptimeCalculator:
-    """
-    Main class for calculating uptime percentages for charging stations.
-    A station is considered "up" if any of its chargers is available.
-    """
-    def __init__(self):
-        # Maps station IDs to their set of charger IDs
-        self.station_chargers: Dict[int, Set[int]] = {}  
-        # Maps charger IDs to their list of status reports
-        self.charger_reports: Dict[int, List[ChargerReport]] = {}   
+class ChargerReportColumns:
+    """
+    Column-oriented storage for all reports of one charger.
+    Start and end times live in 64-bit integer arrays and the up/down flags in a
+    bytearray, i.e. 17 bytes per report instead of a full ChargerReport object.
+    Iterating yields ChargerReport objects for compatibility with the list store.
+    """
+    __slots__ = ('charger_id', 'start_times', 'end_times', 'up_flags')
+
+    def __init__(self, charger_id: int):
+        self.charger_id = charger_id
+        self.start_times = array('q')   # Start time of each report
+        self.end_times = array('q')     # End time of each report
+        self.up_flags = bytearray()     # 1 if the charger was up during the report, 0 if down
+
+    def append(self, start_time: int, end_time: int, is_up: bool) -> None:
+        """
+        Appends a single report to the columns.
+        
+        Raises:
+            ValueError: If a time value does not fit in a signed 64-bit integer
+        """
+        try:
+            self.start_times.append(start_time)
+            self.end_times.append(end_time)
+        except OverflowError:
+            del self.start_times[len(self.end_times):]
+            raise ValueError("Time value out of range")
+        self.up_flags.append(is_up)
+
+    def rows(self) -> Iterator[Tuple[int, int, bool]]:
+        """
+        Iterates reports as (start_time, end_time, is_up) tuples straight from the columns.
+        """
+        return zip(self.start_times, self.end_times, map(bool, self.up_flags))
+
+    def __len__(self) -> int:
+        return len(self.up_flags)
+
+    def __iter__(self) -> Iterator[ChargerReport]:
+        for start_time, end_time, is_up in self.rows():
+            yield ChargerReport(self.charger_id, start_time, end_time, is_up)
+
+class UpIntervalSet:
+    """
+    Sorted, disjoint up intervals of one charger.
+    Intervals are kept as parallel start/end lists and updated in place with
+    bisect, so adding or cutting an interval only touches its neighbours.
+    Updates starting after the last interval's start, as in time-ordered
+    feeds, only touch the tail of the lists in O(1) amortized.
+    """
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self):
+        self.starts: List[int] = []     # Interval start times, ascending
+        self.ends: List[int] = []       # Interval end times, ascending
+
+    def add(self, start: int, end: int) -> None:
+        """
+        Unions [start, end] into the set, merging overlapping or touching intervals.
+        """
+        starts, ends = self.starts, self.ends
+        if not starts or start > ends[-1]:
+            starts.append(start)
+            ends.append(end)
+            return
+        if start > starts[-1]:
+            # Only the last interval can overlap
+            if end > ends[-1]:
+                ends[-1] = end
+            return
+
+        i = bisect_left(self.ends, start)
+        j = bisect_right(self.starts, end)
+        if i < j:
+            start = min(start, self.starts[i])
+            end = max(end, self.ends[j - 1])
+        self.starts[i:j] = [start]
+        self.ends[i:j] = [end]
+
+    def subtract(self, start: int, end: int) -> None:
+        """
+        Removes the open range (start, end) from the set, splitting intervals it cuts.
+        Intervals that merely touch the range are kept.
+        """
+        starts, ends = self.starts, self.ends
+        if not starts or start >= ends[-1]:
+            return
+        if start > starts[-1]:
+            # Only the last interval can be cut
+            last_end = ends[-1]
+            ends[-1] = start
+            if last_end > end:
+                starts.append(end)
+                ends.append(last_end)
+            return
+
+        i = bisect_right(self.ends, start)
+        j = bisect_left(self.starts, end)
+        if i >= j:
+            return
+        new_starts, new_ends = [], []
+        if self.starts[i] < start:
+            new_starts.append(self.starts[i])
+            new_ends.append(start)
+        if self.ends[j - 1] > end:
+            new_starts.append(end)
+            new_ends.append(self.ends[j - 1])
+        self.starts[i:j] = new_starts
+        self.ends[i:j] = new_ends
+
+    def intervals(self) -> List[Tuple[int, int]]:
+        """
+        Returns the intervals as sorted (start, end) tuples.
+        """
+        return list(zip(self.starts, self.ends))
+
+def _report_order(row: Tuple[int, int, bool]) -> Tuple[int, bool]:
+    """
+    Sort key of a (start_time, end_time, is_up) report: by start time, up reports first.
+    """
+    return row[0], not row[2]
+
+def _sweep_charger_reports(rows: List[Tuple[int, int, bool]]) -> UpIntervalSet:
+    """
+    Turns one charger's reports into its disjoint up intervals.
+    Reports are sorted once and swept in order: an up report is unioned into
+    the coverage and a down report cuts everything covered so far, so a down
+    report wins over every up report that starts at or before it.
+    Reports that already arrived in sweep order are swept as they are, in
+    O(n) amortized; otherwise they are sorted first, in O(n log n).
+    
+    Args:
+        rows: (start_time, end_time, is_up) tuples; sorted in place if out of order
+        
+    Returns:
+        The charger's up intervals
+    """
+    coverage = UpIntervalSet()
+    last_start, last_down = None, False
+    for start_time, end_time, is_up in rows:
+        if last_start is not None and (start_time < last_start or
+                                       (start_time == last_start and last_down and is_up)):
+            break
+        last_start, last_down = start_time, not is_up
+        if is_up:
+            coverage.add(start_time, end_time)
+        else:
+            coverage.subtract(start_time, end_time)
+    else:
+        return coverage
+
+    # Out of order: sort and sweep again from scratch
+    rows.sort(key=_report_order)
+    coverage = UpIntervalSet()
+    for start_time, end_time, is_up in rows:
+        if is_up:
+            coverage.add(start_time, end_time)
+        else:
+            coverage.subtract(start_time, end_time)
+    return coverage
+
+class ChargerTimeline:
+    """
+    Normalized timeline of one charger: its disjoint up intervals and the
+    span covered by all of its reports.
+    """
+    __slots__ = ('up_intervals', 'start_time', 'end_time')
+
+    def __init__(self, up_intervals: List[Tuple[int, int]], start_time: int, end_time: int):
+        self.up_intervals = up_intervals    # Sorted, disjoint (start, end) up intervals
+        self.start_time = start_time        # Earliest report start time
+        self.end_time = end_time            # Latest report end time
+
+class IncrementalTimeline:
+    """
+    Normalized timeline of one charger, maintained while its reports are ingested.
+    Reports arriving in sweep order (by start time, up reports first on ties)
+    are applied to the up intervals immediately with bisect. A report arriving
+    out of order marks the intervals stale; they are then re-swept from the
+    charger's stored reports the next time they are needed.
+    
+    Out-of-order reports are not bisect-inserted because the result depends on
+    the sweep order: a down report only removes up time of reports before it,
+    so an earlier report would have to be replayed against every later one.
+    Marking the charger stale instead costs one O(n log n) re-sweep for any
+    number of out-of-order reports between two calculations.
+    """
+    __slots__ = ('coverage', 'start_time', 'end_time', 'last_key', 'stale')
+
+    def __init__(self):
+        self.coverage = UpIntervalSet()                 # Up intervals of the reports applied so far
+        self.start_time: Optional[int] = None           # Earliest report start time
+        self.end_time: Optional[int] = None             # Latest report end time
+        self.last_key: Optional[Tuple[int, bool]] = None  # Sweep key of the last applied report
+        self.stale = False                              # True if coverage misses out-of-order reports
+
+    def add(self, start_time: int, end_time: int, is_up: bool) -> None:
+        """
+        Ingests one report, updating the span and, if it arrives in order, the up intervals.
+        """
+        if self.start_time is None or start_time < self.start_time:
+            self.start_time = start_time
+        if self.end_time is None or end_time > self.end_time:
+            self.end_time = end_time
+        if self.stale:
+            return
+
+        key = (start_time, not is_up)
+        if self.last_key is not None and key < self.last_key:
+            self.stale = True
+            return
+        self.last_key = key
+        if is_up:
+            self.coverage.add(start_time, end_time)
+        else:
+            self.coverage.subtract(start_time, end_time)
+
+    def rebuild(self, rows: List[Tuple[int, int, bool]]) -> None:
+        """
+        Re-sweeps the up intervals from all of the charger's reports.
+        
+        Args:
+            rows: Every (start_time, end_time, is_up) report of the charger; sorted in place
+        """
+        self.coverage = _sweep_charger_reports(rows)
+        self.last_key = _report_order(rows[-1]) if rows else None
+        self.stale = False
+
+    def timeline(self) -> ChargerTimeline:
+        """
+        Returns the current up intervals and span; the intervals must not be stale.
+        """
+        return ChargerTimeline(self.coverage.intervals(), self.start_time, self.end_time)
+
+def _popcount(bits: int) -> int:
+    """
+    Number of set bits in a non-negative integer.
+    """
+    return bin(bits).count('1')
+
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+
+class CoverageBitmap:
+    """
+    Compressed bitmap of up time buckets.
+    Buckets are grouped into chunks of 2**16 (roaring style): empty chunks are
+    absent, chunks that are up throughout are stored as the FULL marker, and
+    only partially up chunks hold a 65536-bit integer. OR-ing two bitmaps is a
+    per-chunk integer OR, and counting up buckets a per-chunk popcount.
+    """
+    CHUNK_BITS = 16
+    CHUNK_SIZE = 1 << CHUNK_BITS
+    FULL = -1                           # Marker of a chunk with every bucket up
+    _ALL_BITS = (1 << CHUNK_SIZE) - 1
+    __slots__ = ('chunks',)
+
+    def __init__(self):
+        self.chunks: Dict[int, int] = {}    # Chunk index -> bit pattern or FULL
+
+    @classmethod
+    def from_intervals(cls, intervals: Iterable[Tuple[int, int]], bucket_width: int) -> 'CoverageBitmap':
+        """
+        Builds the bitmap of up intervals quantized to buckets.
+        Bucket b stands for the time b * bucket_width and is up if some interval
+        [start, end) contains that time.
+        """
+        bitmap = cls()
+        for start, end in intervals:
+            bitmap.add_range(-(-start // bucket_width), -(-end // bucket_width))
+        return bitmap
+
+    def add_range(self, first: int, last: int) -> None:
+        """
+        Marks buckets [first, last) as up.
+        """
+        chunks = self.chunks
+        while first < last:
+            chunk = first >> self.CHUNK_BITS
+            base = chunk << self.CHUNK_BITS
+            stop = min(last, base + self.CHUNK_SIZE)
+            current = chunks.get(chunk, 0)
+            if current != self.FULL:
+                bits = current | (((1 << (stop - first)) - 1) << (first - base))
+                chunks[chunk] = self.FULL if bits == self._ALL_BITS else bits
+            first = stop
+
+    def __ior__(self, other: 'CoverageBitmap') -> 'CoverageBitmap':
+        chunks = self.chunks
+        for chunk, bits in other.chunks.items():
+            current = chunks.get(chunk)
+            if current is None or bits == self.FULL:
+                chunks[chunk] = bits
+            elif current != self.FULL:
+                bits |= current
+                chunks[chunk] = self.FULL if bits == self._ALL_BITS else bits
+        return self
+
+    def count(self) -> int:
+        """
+        Returns the number of up buckets.
+        """
+        return sum(self.CHUNK_SIZE if bits == self.FULL else _popcount(bits)
+                   for bits in self.chunks.values())
+
+class StationIntervalTree:
+    """
+    Centered interval tree over the merged up intervals of all stations.
+    Each node keeps the intervals containing its center time, sorted by start
+    and by end, so a stabbing query walks one root-to-leaf path and stops
+    scanning a node's lists at the first interval that misses: O(log n + k)
+    for k matching intervals. Intervals are half-open [start, end).
+    """
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right')
+
+    def __init__(self, entries: List[Tuple[int, int, int]]):
+        """
+        Args:
+            entries: Non-empty list of (start, end, station_id) with start < end
+        """
+        # The median start is contained by its own interval, so every node keeps at least one
+        starts = sorted(start for start, _, _ in entries)
+        center = starts[len(starts) // 2]
+        left, here, right = [], [], []
+        for entry in entries:
+            if entry[1] <= center:
+                left.append(entry)
+            elif entry[0] > center:
+                right.append(entry)
+            else:
+                here.append(entry)
+        self.center = center
+        self.by_start = sorted(here)
+        self.by_end = sorted(here, key=lambda entry: entry[1], reverse=True)
+        self.left = StationIntervalTree(left) if left else None
+        self.right = StationIntervalTree(right) if right else None
+
+    @classmethod
+    def build(cls, station_intervals: Dict[int, List[Tuple[int, int]]]) -> Optional['StationIntervalTree']:
+        """
+        Builds a tree from each station's merged intervals.
+        
+        Returns:
+            The tree root, or None if no station has a non-empty up interval
+        """
+        entries = [(start, end, station_id)
+                   for station_id, intervals in station_intervals.items()
+                   for start, end in intervals if start < end]
+        return cls(entries) if entries else None
+
+    def query(self, time: int) -> List[Tuple[int, int, int]]:
+        """
+        Returns the (start, end, station_id) intervals containing a time.
+        """
+        found = []
+        node = self
+        while node is not None:
+            if time < node.center:
+                # Every interval here ends after the center; only its start matters
+                for entry in node.by_start:
+                    if entry[0] > time:
+                        break
+                    found.append(entry)
+                node = node.left
+            else:
+                # Every interval here starts at or before the center; only its end matters
+                for entry in node.by_end:
+                    if entry[1] <= time:
+                        break
+                    found.append(entry)
+                node = node.right
+        return found
+
+class UptimePrefixIndex:
+    """
+    A station's merged up intervals with cumulative up-time prefix sums.
+    The up time before any moment takes one bisect over the interval starts,
+    so the up time within a window [t1, t2) is two bisects and a subtraction.
+    """
+    __slots__ = ('starts', 'ends', 'prefix')
+
+    def __init__(self, intervals: List[Tuple[int, int]]):
+        """
+        Args:
+            intervals: Sorted, disjoint (start, end) up intervals
+        """
+        self.starts = [start for start, _ in intervals]
+        self.ends = [end for _, end in intervals]
+        # prefix[i] is the total length of the first i intervals
+        self.prefix = [0]
+        for start, end in intervals:
+            self.prefix.append(self.prefix[-1] + end - start)
+
+    def up_time_before(self, time: int) -> int:
+        """
+        Returns the total up time before a moment.
+        """
+        i = bisect_right(self.starts, time)
+        if i == 0:
+            return 0
+        # The last interval starting at or before `time` may still be running
+        return self.prefix[i] - max(0, self.ends[i - 1] - time)
+
+    def up_time(self, window_start: int, window_end: int) -> int:
+        """
+        Returns the up time within [window_start, window_end).
+        """
+        return self.up_time_before(window_end) - self.up_time_before(window_start)
+
+def _merge_intervals(interval_lists: Iterable[List[Tuple[int, int]]]) -> Iterator[Tuple[int, int]]:
+    """
+    Merges several sorted interval lists into non-overlapping intervals.
+    The lists are combined with a k-way heap merge, so N intervals from
+    k lists cost O(N log k) and are never concatenated or re-sorted.
+    
+    Args:
+        interval_lists: Lists of (start, end) time tuples, each sorted by start
+        
+    Yields:
+        Merged non-overlapping intervals in time order
+    """
+    intervals = heapq.merge(*interval_lists)
+    first = next(intervals, None)
+    if first is None:
+        return
+    
+    merged_start, merged_end = first
+    for start, end in intervals:
+        if start <= merged_end:
+            # Intervals overlap, update end time
+            if end > merged_end:
+                merged_end = end
+        else:
+            # No overlap, emit the finished interval
+            yield merged_start, merged_end
+            merged_start, merged_end = start, end
+    yield merged_start, merged_end
+
+def _clip_intervals(intervals: List[Tuple[int, int]], window_start: int,
+                    window_end: int) -> List[Tuple[int, int]]:
+    """
+    Clips sorted, disjoint intervals to [window_start, window_end), dropping empty pieces.
+    Intervals outside the window are skipped with bisect rather than visited.
+    """
+    # Only the last interval starting before the window can reach into it
+    first = max(0, bisect_left(intervals, (window_start,)) - 1)
+    last = bisect_left(intervals, (window_end,))
+    clipped = []
+    for start, end in intervals[first:last]:
+        start = max(start, window_start)
+        end = min(end, window_end)
+        if start < end:
+            clipped.append((start, end))
+    return clipped
+
+def _bucket_up_times(intervals: List[Tuple[int, int]], series_start: int, series_end: int,
+                     bucket_width: int) -> List[int]:
+    """
+    Distributes sorted, disjoint up intervals into consecutive buckets.
+    Bucket i covers [series_start + i * bucket_width, series_start + (i + 1) * bucket_width),
+    the last one cut off at series_end. Each interval is visited once and each
+    bucket it fully covers is filled directly, so the cost is O(intervals + buckets).
+    
+    Returns:
+        Up time per bucket
+    """
+    totals = [0] * -(-(series_end - series_start) // bucket_width)
+    for start, end in _clip_intervals(intervals, series_start, series_end):
+        first = (start - series_start) // bucket_width
+        last = (end - 1 - series_start) // bucket_width
+        if first == last:
+            totals[first] += end - start
+            continue
+        totals[first] += series_start + (first + 1) * bucket_width - start
+        for bucket in range(first + 1, last):
+            totals[bucket] = bucket_width
+        totals[last] += end - (series_start + last * bucket_width)
+    return totals
+
+class _UpTimeCursor:
+    """
+    Forward-only position over sorted, disjoint up intervals that measures the
+    up time passed over by each advance. Across all advances every interval is
+    visited once, so sliding a window costs O(intervals + steps).
+    """
+    __slots__ = ('intervals', 'index', 'position')
+
+    def __init__(self, intervals: List[Tuple[int, int]], position: int):
+        self.intervals = intervals
+        self.position = position
+        # First interval still ending after the position
+        index = max(0, bisect_left(intervals, (position,)) - 1)
+        if index < len(intervals) and intervals[index][1] <= position:
+            index += 1
+        self.index = index
+
+    def advance(self, time: int) -> int:
+        """
+        Moves the cursor forward to `time` and returns the up time in between.
+        """
+        intervals = self.intervals
+        gained = 0
+        while self.index < len(intervals):
+            start, end = intervals[self.index]
+            if start >= time:
+                break
+            gained += min(end, time) - max(start, self.position)
+            if end > time:
+                break
+            self.index += 1
+        self.position = time
+        return gained
+
+def _report_rows(reports: Union[List[ChargerReport], ChargerReportColumns]) -> List[Tuple[int, int, bool]]:
+    """
+    Returns a charger's reports as (start_time, end_time, is_up) tuples from either store.
+    """
+    if isinstance(reports, ChargerReportColumns):
+        return list(reports.rows())
+    return [(r.start_time, r.end_time, r.is_up) for r in reports]
+
+def _read_magic(filepath: str) -> bytes:
+    """
+    Returns the leading bytes of a file, enough to identify every supported format.
+    """
+    with open(filepath, 'rb') as f:
+        return f.read(len(SNAPSHOT_MAGIC))
+
+def _detect_compression(head: bytes) -> Optional[Callable]:
+    """
+    Matches the leading magic bytes of a file against the compressed formats.
+    
+    Args:
+        head: First bytes of the input file
+        
+    Returns:
+        The gzip/bz2/lzma open function for a compressed file, None for plain text
+    """
+    for magic, opener in _COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return opener
+    return None
+
+def _tokenize_report_line(line: str) -> Tuple[int, int, int, bool]:
+    """
+    Parses and validates a single report line.
+    
+    Args:
+        line: '<Charger ID> <start time> <end time> <up (true/false)>'
+        
+    Returns:
+        (charger_id, start_time, end_time, is_up) tuple
+        
+    Raises:
+        ValueError: If the line is malformed or its time range is invalid
+    """
+    parts = line.split()
+    if len(parts) != 4:
+        raise ValueError("Invalid report line format")
+
+    charger_id = int(parts[0])
+    start_time = int(parts[1])
+    end_time = int(parts[2])
+    is_up = parts[3].lower() == 'true'
+
+    # Validate time range
+    if start_time > end_time:
+        raise ValueError("Start time cannot be greater than end time")
+
+    return charger_id, start_time, end_time, is_up
+
+def _find_section_offsets(buf) -> Tuple[int, int, int]:
+    """
+    Locates the section headers in a bytes-like buffer (e.g. an mmap).
+    
+    Args:
+        buf: Buffer holding the whole input file
+        
+    Returns:
+        (stations_body_start, stations_body_end, reports_body_start) byte offsets
+        
+    Raises:
+        ValueError: If a section is missing or the reports section comes first
+    """
+    stations = _STATIONS_HEADER_RE.search(buf)
+    reports = _REPORTS_HEADER_RE.search(buf)
+    if stations is None or reports is None or reports.start() < stations.start():
+        raise ValueError("Missing required sections")
+    return stations.end(), reports.start(), reports.end()
+
+def _iter_mapped_reports(mm: mmap.mmap, start: int, end: int,
+                         chargers: Optional[Set[int]] = None) -> Iterator[Tuple[int, int, int, bool]]:
+    """
+    Tokenizes report lines directly from mapped bytes, without decoding to str.
+    
+    Args:
+        mm: Memory-mapped input file
+        start: Byte offset of the first line to parse
+        end: Byte offset to stop at; a line starting before it is parsed in full
+        chargers: If given, lines for other chargers are skipped after reading
+                  only their charger ID
+        
+    Yields:
+        (charger_id, start_time, end_time, is_up) tuples
+        
+    Raises:
+        ValueError: If a report line is malformed
+    """
+    mm.seek(start)
+    readline = mm.readline
+    while mm.tell() < end:
+        line = readline()
+        if chargers is not None:
+            head = line.split(None, 1)
+            if not head or int(head[0]) not in chargers:
+                continue
+        parts = line.split()
+        if not parts:
+            continue
+        if len(parts) != 4:
+            raise ValueError("Invalid report line format")
+
+        start_time = int(parts[1])
+        end_time = int(parts[2])
+        if start_time > end_time:
+            raise ValueError("Start time cannot be greater than end time")
+        yield int(parts[0]), start_time, end_time, parts[3].lower() == b'true'
+
+def _parse_report_range(mm: mmap.mmap, start: int, end: int,
+                        chargers: Optional[Set[int]] = None) -> Dict[int, ReportColumns]:
+    """
+    Parses a line-aligned byte range of the reports section into per-charger columns.
+    Without a charger selection the range is cut into blocks of about
+    REPORT_BLOCK_BYTES and each block is split into lines in one call; the
+    lines are then tokenized in a single tight loop that groups rows by the
+    raw charger ID bytes, converting each distinct ID only once. With a
+    selection, lines are read one at a time so that skipped lines are only
+    read up to their charger ID.
+    
+    Raises:
+        ValueError: If a line is malformed
+    """
+    if chargers is not None:
+        return _collect_report_columns(_iter_mapped_reports(mm, start, end, chargers))
+
+    grouped: Dict[bytes, Tuple[List[int], List[int], bytearray]] = {}
+    for block_start, block_end in _chunk_ranges(mm, start, end, (end - start) // REPORT_BLOCK_BYTES):
+        for line in mm[block_start:block_end].split(b'\n'):
+            parts = line.split()
+            if len(parts) != 4:
+                if not parts:
+                    continue
+                raise ValueError("Invalid report line format")
+            charger_id, start_time, end_time, flag = parts
+            start_time = int(start_time)
+            end_time = int(end_time)
+            if start_time > end_time:
+                raise ValueError("Start time cannot be greater than end time")
+            columns = grouped.get(charger_id)
+            if columns is None:
+                columns = grouped[charger_id] = ([], [], bytearray())
+            columns[0].append(start_time)
+            columns[1].append(end_time)
+            columns[2].append(flag == b'true' or flag.lower() == b'true')
+    return _pack_report_columns(grouped)
+
+def _chunk_ranges(mm: mmap.mmap, start: int, end: int, chunks: int) -> List[Tuple[int, int]]:
+    """
+    Splits the byte range [start, end) into up to `chunks` ranges aligned on line starts.
+    
+    Args:
+        mm: Memory-mapped input file
+        start: First byte of the range
+        end: End of the range (exclusive)
+        chunks: Desired number of ranges
+        
+    Returns:
+        List of contiguous (start, end) ranges covering [start, end)
+    """
+    step = max(1, (end - start) // max(1, chunks))
+    ranges = []
+    pos = start
+    while pos < end:
+        boundary = mm.find(b'\n', min(pos + step, end) - 1, end)
+        boundary = end if boundary == -1 else boundary + 1
+        ranges.append((pos, boundary))
+        pos = boundary
+    return ranges
+
+def _collect_report_columns(reports: Iterable[Tuple[int, int, int, bool]]) -> Dict[int, ReportColumns]:
+    """
+    Groups (charger_id, start_time, end_time, is_up) reports into per-charger columns, keeping their order.
+    """
+    grouped: Dict[int, Tuple[List[int], List[int], bytearray]] = {}
+    for charger_id, start_time, end_time, is_up in reports:
+        columns = grouped.get(charger_id)
+        if columns is None:
+            columns = grouped[charger_id] = ([], [], bytearray())
+        columns[0].append(start_time)
+        columns[1].append(end_time)
+        columns[2].append(is_up)
+    return _pack_report_columns(grouped)
+
+def _pack_report_columns(grouped: Dict[Union[int, bytes], Tuple[List[int], List[int], bytearray]]
+                         ) -> Dict[int, ReportColumns]:
+    """
+    Converts grouped report lists into per-charger columns keyed by integer charger ID.
+    Times are packed into array('q') so that the columns cross process
+    boundaries as raw bytes; columns with a time beyond 64 bits stay lists.
+    Groups whose raw IDs denote the same integer (e.g. b'7' and b'07') are
+    concatenated in their first-seen order.
+    
+    Raises:
+        ValueError: If a charger ID is not an integer
+    """
+    merged: Dict[int, Tuple[List[int], List[int], bytearray]] = {}
+    for raw_id, (start_times, end_times, up_flags) in grouped.items():
+        charger_id = int(raw_id)
+        if charger_id in merged:
+            merged[charger_id][0].extend(start_times)
+            merged[charger_id][1].extend(end_times)
+            merged[charger_id][2].extend(up_flags)
+        else:
+            merged[charger_id] = (start_times, end_times, up_flags)
+
+    packed = {}
+    for charger_id, (start_times, end_times, up_flags) in merged.items():
+        try:
+            packed[charger_id] = (array('q', start_times), array('q', end_times), up_flags)
+        except OverflowError:
+            packed[charger_id] = (start_times, end_times, up_flags)
+    return packed
+
+def _parse_report_chunk(filepath: str, start: int, end: int,
+                        chargers: Optional[Set[int]] = None) -> Dict[int, ReportColumns]:
+    """
+    Worker entry point for parallel parsing: parses one byte range of the reports section.
+    
+    Args:
+        filepath: Path to the input file
+        start: Byte offset of the first line of the chunk
+        end: Byte offset where the chunk ends
+        chargers: If given, only reports for these chargers are kept
+        
+    Returns:
+        Partial mapping of charger ID to its report columns, in file order
+        
+    Raises:
+        ValueError: If any line in the chunk is malformed
+    """
+    with open(filepath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _parse_report_range(mm, start, end, chargers)
+
+def _parse_report_shard(filepath: str, chargers: Optional[Set[int]] = None) -> Dict[int, ReportColumns]:
+    """
+    Worker entry point for sharded input: parses one report shard file.
+    A shard holds report lines only, optionally preceded by the
+    [Charger Availability Reports] header; it may be gzip/bz2/xz compressed.
+    
+    Args:
+        filepath: Path to the shard
+        chargers: If given, lines for other chargers are skipped after reading
+                  only their charger ID
+        
+    Returns:
+        Partial mapping of charger ID to its report columns, in file order
+        
+    Raises:
+        ValueError: If any line in the shard is malformed
+    """
+    opener = _detect_compression(_read_magic(filepath)) or open
+    with opener(filepath, 'rt') as f:
+        return _collect_report_columns(_iter_shard_reports(f, chargers))
+
+def _iter_shard_reports(lines: Iterable[str],
+                        chargers: Optional[Set[int]] = None) -> Iterator[Tuple[int, int, int, bool]]:
+    """
+    Tokenizes the lines of a report shard, skipping blank lines and a leading
+    [Charger Availability Reports] header.
+    """
+    header_allowed = True
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if header_allowed and stripped == REPORTS_HEADER:
+            header_allowed = False
+            continue
+        header_allowed = False
+        if chargers is not None and int(stripped.split(None, 1)[0]) not in chargers:
+            continue
+        yield _tokenize_report_line(line)
+
+def _expand_shard_patterns(patterns: Iterable[str]) -> List[str]:
+    """
+    Expands report shard paths and glob patterns, keeping the given order and
+    sorting the matches of each pattern.
+    
+    Raises:
+        ValueError: If a glob pattern matches no files
+    """
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                raise ValueError(f"No report shards match {pattern}")
+            paths.extend(matches)
+        else:
+            paths.append(pattern)
+    return paths
+
+class SnapshotCache:
+    """
+    Opt-in on-disk cache of parsed input files, stored as snapshots.
+    Entries are keyed by the input's absolute path, size, mtime and content
+    hash, and the least recently used entries are evicted once the directory
+    grows beyond max_bytes.
+    """
+    SUFFIX = '.snap'
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.directory = directory      # Directory holding the cached snapshots
+        self.max_bytes = max_bytes      # Upper bound on the total size of cached snapshots
+
+    def key(self, filepath: str) -> str:
+        """
+        Computes the cache key of an input file.
+        
+        Args:
+            filepath: Path to the input file
+            
+        Returns:
+            Hex digest identifying the file's path, size, mtime and content
+        """
+        stat = os.stat(filepath)
+        content = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                content.update(block)
+        identity = f"{os.path.abspath(filepath)}\0{stat.st_size}\0{stat.st_mtime_ns}\0{content.hexdigest()}"
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """
+        Returns the snapshot path cached under `key`, or None on a miss.
+        A hit refreshes the entry's mtime, which serves as its last-use time.
+        """
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def store(self, calculator: 'StationUptimeCalculator', key: str) -> None:
+        """
+        Caches the calculator's parsed state under `key`, then evicts old entries.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            calculator.write_snapshot(temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes least recently used snapshots until the cache fits in max_bytes.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.SUFFIX):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+
+class StationUptimeCalculator:
+    """
+    Main class for calculating uptime percentages for charging stations.
+    A station is considered "up" if any of its chargers is available.
+    """
+    def __init__(self, columnar: Optional[bool] = None, stations: Optional[Iterable[int]] = None,
+                 incremental: bool = False, engine: Union[str, 'UptimeEngine', None] = None):
+        """
+        Args:
+            columnar: Store reports as ChargerReportColumns (compact arrays)
+                      instead of lists of ChargerReport objects. None (default)
+                      chooses columns for bulk loads into an empty calculator
+                      (memory-mapped, parallel and sharded parses and
+                      snapshot loads) and lists otherwise, or when a time
+                      does not fit in 64 bits. Pass False to always get
+                      lists of ChargerReport objects.
+            stations: Only keep these stations and the reports of their chargers.
+                      Report lines for other chargers are discarded after reading
+                      only their charger ID, so their other fields are not validated.
+            incremental: Maintain each charger's normalized up intervals while
+                         reports are ingested, so repeated calculations only merge
+                         already-clean interval lists
+            engine: Engine computing calculate_station_uptime, as an UptimeEngine
+                    or a name from ENGINES (default: the sweep-line engine)
+        """
+        self.columnar = columnar
+        # True if the store type is chosen automatically (columnar=None)
+        self._auto_columnar = columnar is None
+        self.incremental = incremental
+        self.engine = make_engine(engine)
+        # Sweep-line engine behind windows, series, rankings and point queries
+        self._sweep_engine = self.engine if isinstance(self.engine, SweepEngine) else SweepEngine()
+        # Station IDs selected for parsing, or None for all stations
+        self.selected_stations: Optional[Set[int]] = set(stations) if stations is not None else None
+        # Chargers of the selected stations seen so far, or None without a selection
+        self._selected_chargers: Optional[Set[int]] = set() if stations is not None else None
+        # Maps station IDs to their set of charger IDs
+        self.station_chargers: Dict[int, Set[int]] = {}  
+        # Maps charger IDs to their status reports (list or columns, see `columnar`).
+        # Add reports through the parsers; after changing this or station_chargers
+        # directly, call invalidate_caches() before the next calculation.
+        self.charger_reports: Dict[int, Union[List[ChargerReport], ChargerReportColumns]] = {}   
+        # Maps charger IDs to their ingest-time timelines (only with `incremental`)
+        self.charger_timelines: Dict[int, IncrementalTimeline] = {}
+        # Bucket width -> charger ID -> up bitmap; dropped whenever reports are added
+        self.charger_bitmaps: Dict[int, Dict[int, CoverageBitmap]] = {}
+        # Station ID -> merged up intervals kept by the last calculation, for queries
+        self.station_intervals: Optional[Dict[int, List[Tuple[int, int]]]] = None
+        # Stabbing index over station_intervals, built on the first point query
+        self._interval_tree: Optional[StationIntervalTree] = None
+        # Station ID -> prefix-sum index over station_intervals, built on the first window query
+        self._prefix_indexes: Dict[int, UptimePrefixIndex] = {}
+        # Charger timelines built by sweep-line calculations and windows, reused until new data arrives
+        self._timelines: Optional[Dict[int, Optional[ChargerTimeline]]] = None
+        # Charger ID -> (earliest start, latest end) of its reports, built by the first windowed calculation
+        self._charger_bounds: Optional[Dict[int, Tuple[int, int]]] = None
+        # True while any of the structures above are built and must be dropped on new data
+        self._derived = False
+
+    def parse_input_file(self, filepath: str, use_mmap: Optional[bool] = None,
+                         workers: Optional[int] = 1, cache: Optional[SnapshotCache] = None) -> None:
+        """
+        Parses the input file containing station configurations and charger reports.
+        The file is streamed line by line, so memory use is proportional to the
+        parsed stations and reports rather than to the size of the file text.
+        gzip, bz2 and xz files are detected by their magic bytes and decompressed
+        on the fly; such files always take the streaming text path. Compiled
+        snapshots (see write_snapshot) are detected the same way and loaded
+        without any text parsing.
+        
+        Args:
+            filepath: Path to the input file
+            use_mmap: Parse the raw bytes through a memory map instead of decoding
+                      text lines. Defaults to True for files of at least
+                      MMAP_THRESHOLD_BYTES.
+            workers: Number of processes parsing the reports section in parallel
+                     (None for one per CPU). More than one implies use_mmap.
+            cache: Parsed-input cache to load from and populate. Only used when
+                   the calculator is still empty and has no station selection.
+            
+        Raises:
+            ValueError: If file format is invalid or missing required sections
+        """
+        try:
+            head = _read_magic(filepath)
+            if head == SNAPSHOT_MAGIC:
+                self.load_snapshot(filepath)
+                return
+
+            if (cache is not None and self.selected_stations is None
+                    and not self.station_chargers and not self.charger_reports):
+                key = cache.key(filepath)
+                cached = cache.lookup(key)
+                if cached is not None:
+                    self.load_snapshot(cached)
+                    return
+                self._parse_uncached(filepath, head, use_mmap, workers)
+                try:
+                    cache.store(self, key)
+                except (OSError, ValueError):
+                    # Caching is best effort; the parse itself succeeded
+                    pass
+                return
+
+            self._parse_uncached(filepath, head, use_mmap, workers)
+        except (IOError, EOFError, lzma.LZMAError, zlib.error, struct.error, ValueError, IndexError) as e:
+            raise ValueError(f"Error parsing input file: {str(e)}")
+
+    def parse_input_stream(self, stream: BinaryIO) -> None:
+        """
+        Parses input from a binary stream such as sys.stdin.buffer or a pipe.
+        Lines are consumed as soon as they arrive, without buffering the whole
+        stream; gzip, bz2 and xz streams are decompressed on the fly.
+        
+        Args:
+            stream: Readable binary stream
+            
+        Raises:
+            ValueError: If the input format is invalid or missing required sections
+        """
+        try:
+            buffered = stream if hasattr(stream, 'peek') else io.BufferedReader(stream)
+            head = buffered.peek(len(SNAPSHOT_MAGIC))[:len(SNAPSHOT_MAGIC)]
+            if head == SNAPSHOT_MAGIC:
+                raise ValueError("Snapshots can only be loaded from a file")
+            opener = _detect_compression(head)
+            if opener is not None:
+                buffered = opener(buffered)
+            self._parse_lines(io.TextIOWrapper(buffered))
+        except (IOError, EOFError, lzma.LZMAError, zlib.error, ValueError, IndexError) as e:
+            raise ValueError(f"Error parsing input stream: {str(e)}")
+
+    def _parse_uncached(self, filepath: str, head: bytes, use_mmap: Optional[bool],
+                        workers: Optional[int]) -> None:
+        """
+        Parses a text or compressed input file, choosing the reader from its
+        leading bytes and the parse_input_file options.
+        """
+        opener = _detect_compression(head)
+        if opener is not None:
+            with opener(filepath, 'rt') as f:
+                self._parse_lines(f)
+            return
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if use_mmap is None:
+            use_mmap = workers > 1 or os.path.getsize(filepath) >= MMAP_THRESHOLD_BYTES
+        if use_mmap:
+            self._parse_mapped_file(filepath, workers)
+        else:
+            with open(filepath, 'r') as f:
+                self._parse_lines(f)
+
+    def _parse_mapped_file(self, filepath: str, workers: int = 1) -> None:
+        """
+        Parses the input file from a read-only memory map.
+        Section headers are located with a bytes regex and report lines are
+        tokenized as bytes, so no str decoding happens on the hot path.
+        With several workers the reports section is split into line-aligned
+        byte ranges that are parsed in a process pool and merged in file order.
+        
+        Args:
+            filepath: Path to the input file
+            workers: Number of worker processes for the reports section
+            
+        Raises:
+            ValueError: If a section is missing or a line is malformed
+        """
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("Missing required sections")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                stations_start, stations_end, reports_start = _find_section_offsets(mm)
+
+                for line in mm[stations_start:stations_end].splitlines():
+                    if line.strip():
+                        self._parse_station_line(line)
+
+                # Reports arrive as per-charger columns, which a columnar store takes in bulk
+                self._prefer_columnar()
+                chunks = min(workers, (len(mm) - reports_start) // MIN_PARALLEL_CHUNK_BYTES)
+                if chunks <= 1:
+                    self._merge_partial(_parse_report_range(mm, reports_start, len(mm), self._selected_chargers))
+                    return
+                ranges = _chunk_ranges(mm, reports_start, len(mm), chunks)
+
+        # A malformed line in any chunk re-raises its ValueError here
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            partials = pool.map(_parse_report_chunk, [filepath] * len(ranges),
+                                [start for start, _ in ranges], [end for _, end in ranges],
+                                [self._selected_chargers] * len(ranges))
+            for partial in partials:
+                self._merge_partial(partial)
+
+    def parse_sharded_input(self, stations_file: str, report_shards: Iterable[str],
+                            workers: Optional[int] = None) -> None:
+        """
+        Parses a stations file plus any number of report shard files.
+        The stations file uses the regular format, with the reports section
+        optional. Shards hold report lines only (see _parse_report_shard), are
+        given as paths or glob patterns, and are parsed concurrently; their
+        reports are merged in shard order.
+        
+        Args:
+            stations_file: Path to the file with the [Stations] section
+            report_shards: Paths or glob patterns of the report shards
+            workers: Number of processes parsing shards (None for one per CPU)
+            
+        Raises:
+            ValueError: If any file is invalid, missing or a pattern matches nothing
+        """
+        try:
+            opener = _detect_compression(_read_magic(stations_file)) or open
+            with opener(stations_file, 'rt') as f:
+                self._parse_lines(f, require_reports=False)
+
+            paths = _expand_shard_patterns(report_shards)
+            self._prefer_columnar()
+            if workers is None:
+                workers = os.cpu_count() or 1
+            workers = min(workers, len(paths))
+            if workers <= 1:
+                for path in paths:
+                    self._merge_partial(_parse_report_shard(path, self._selected_chargers))
+                return
+
+            # A malformed line in any shard re-raises its ValueError here
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for partial in pool.map(_parse_report_shard, paths, [self._selected_chargers] * len(paths)):
+                    self._merge_partial(partial)
+        except (IOError, EOFError, lzma.LZMAError, zlib.error, ValueError, IndexError) as e:
+            raise ValueError(f"Error parsing input file: {str(e)}")
+
+    def _merge_partial(self, partial: Dict[int, ReportColumns]) -> None:
+        """
+        Stores the reports of a partial parse produced by a worker process,
+        one bulk column extension per charger. Times beyond 64 bits arrive as
+        lists instead of packed arrays; an automatically chosen columnar store
+        then reverts to report objects, as the text parser would have built.
+        """
+        if (self._auto_columnar and self.columnar
+                and any(not isinstance(start_times, array) for start_times, _, _ in partial.values())):
+            self._use_report_lists()
+        for charger_id, (start_times, end_times, up_flags) in partial.items():
+            self._add_reports(charger_id, start_times, end_times, up_flags)
+
+    def _prefer_columnar(self) -> None:
+        """
+        Switches an automatic store (columnar=None) to columns while it is still
+        empty, ahead of a bulk load whose columns can then be extended directly.
+        """
+        if self.columnar is None and not self.charger_reports:
+            self.columnar = True
+
+    def _use_report_lists(self) -> None:
+        """
+        Switches the store to lists of ChargerReport objects, converting the reports stored so far.
+        """
+        for charger_id, reports in self.charger_reports.items():
+            if isinstance(reports, ChargerReportColumns):
+                self.charger_reports[charger_id] = list(map(
+                    ChargerReport, repeat(charger_id), reports.start_times, reports.end_times,
+                    map(bool, reports.up_flags)))
+        self.columnar = False
+
+    def _parse_lines(self, lines: Iterable[str], require_reports: bool = True) -> None:
+        """
+        Single-pass state machine over the input lines.
+        Switches state on the [Stations] and [Charger Availability Reports] headers;
+        anything before [Stations] is ignored. A header must be the whole line, as
+        in the original parser, which stripped only the whole file: leading
+        whitespace is allowed before the first line and trailing whitespace
+        after the last one.
+        
+        Args:
+            lines: Iterable of input lines (e.g. an open text file)
+            require_reports: Whether the reports section header must be present
+            
+        Raises:
+            ValueError: If a section is missing or a line is malformed
+        """
+        state = _PREAMBLE
+        # True until the first non-blank line, whose leading whitespace is ignored
+        at_start = True
+        # A reports header with trailing whitespace, valid only if nothing else follows
+        trailing_header = None
+        for line in lines:
+            if state == _REPORTS:
+                # Hot path: every line after the reports header is a report
+                if line.strip():
+                    self._parse_report_line(line)
+                continue
+
+            stripped = line.strip()
+            header = line.rstrip('\r\n')
+            if at_start and stripped:
+                header = header.lstrip()
+                at_start = False
+            if state == _PREAMBLE:
+                if header == STATIONS_HEADER:
+                    state = _STATIONS
+                elif header == REPORTS_HEADER:
+                    # Reports before any station definitions
+                    raise ValueError("Missing required sections")
+            elif stripped and trailing_header is not None:
+                # The padded header line was not the end of the file, so it is a bad station line
+                self._parse_station_line(trailing_header)
+            elif header == REPORTS_HEADER:
+                state = _REPORTS
+            elif header.rstrip() == REPORTS_HEADER:
+                trailing_header = line
+            elif stripped:
+                self._parse_station_line(line)
+
+        if trailing_header is not None:
+            state = _REPORTS
+        if state == _PREAMBLE or (state == _STATIONS and require_reports):
+            raise ValueError("Missing required sections")
+
+    def _parse_station_line(self, line: str) -> None:
+        """
+        Parses a single line of the [Stations] section.
+        
+        Args:
+            line: '<Station ID> <Charger ID 1> ... <Charger ID n>' (str or bytes)
+        """
+        parts = line.split()
+        if len(parts) < 2:
+            raise ValueError("Invalid station line format")
+        station_id = int(parts[0])
+        charger_ids = set(map(int, parts[1:]))
+        self._add_station(station_id, charger_ids)
+
+    def _add_station(self, station_id: int, charger_ids: Set[int]) -> None:
+        """
+        Stores a station definition, unless a station selection excludes it.
+        """
+        if self.selected_stations is not None:
+            if station_id not in self.selected_stations:
+                return
+            self._selected_chargers.update(charger_ids)
+        self.station_chargers[station_id] = charger_ids
+        if self._derived:
+            self._drop_derived()
+
+    def _parse_report_line(self, line: str) -> None:
+        """
+        Parses a single line of the [Charger Availability Reports] section.
+        
+        Args:
+            line: '<Charger ID> <start time> <end time> <up (true/false)>'
+        """
+        chargers = self._selected_chargers
+        if chargers is not None and int(line.split(None, 1)[0]) not in chargers:
+            return
+        self._add_report(*_tokenize_report_line(line))
+
+    def _add_report(self, charger_id: int, start_time: int, end_time: int, is_up: bool) -> None:
+        """
+        Stores a single validated report for a charger.
+        """
+        if self.columnar:
+            if charger_id not in self.charger_reports:
+                self.charger_reports[charger_id] = ChargerReportColumns(charger_id)
+            self.charger_reports[charger_id].append(start_time, end_time, is_up)
+        else:
+            report = ChargerReport(charger_id, start_time, end_time, is_up)
+            if charger_id not in self.charger_reports:
+                self.charger_reports[charger_id] = []
+            self.charger_reports[charger_id].append(report)
+
+        if self.incremental:
+            if charger_id not in self.charger_timelines:
+                self.charger_timelines[charger_id] = IncrementalTimeline()
+            self.charger_timelines[charger_id].add(start_time, end_time, is_up)
+        if self._derived:
+            self._drop_derived()
+
+    def _add_reports(self, charger_id: int, start_times: Iterable[int], end_times: Iterable[int],
+                     up_flags: Iterable[int]) -> None:
+        """
+        Stores a batch of validated reports for a charger, given as equal-length columns.
+        The columnar store extends its arrays in bulk; the list store builds
+        its ChargerReport objects in one pass without per-report bookkeeping.
+        """
+        if self.columnar:
+            if charger_id not in self.charger_reports:
+                self.charger_reports[charger_id] = ChargerReportColumns(charger_id)
+            columns = self.charger_reports[charger_id]
+            first = len(columns)
+            try:
+                columns.start_times.extend(start_times)
+                columns.end_times.extend(end_times)
+            except OverflowError:
+                del columns.start_times[first:]
+                del columns.end_times[first:]
+                raise ValueError("Time value out of range")
+            columns.up_flags.extend(up_flags)
+        else:
+            if charger_id not in self.charger_reports:
+                self.charger_reports[charger_id] = []
+            reports = self.charger_reports[charger_id]
+            first = len(reports)
+            reports.extend(map(ChargerReport, repeat(charger_id), start_times, end_times, map(bool, up_flags)))
+        if self._derived:
+            self._drop_derived()
+
+        if self.incremental:
+            if charger_id not in self.charger_timelines:
+                self.charger_timelines[charger_id] = IncrementalTimeline()
+            timeline = self.charger_timelines[charger_id]
+            # Apply the new rows in place, without copying them out of the store
+            reports = self.charger_reports[charger_id]
+            if isinstance(reports, ChargerReportColumns):
+                added = zip(islice(reports.start_times, first, None), islice(reports.end_times, first, None),
+                            map(bool, islice(reports.up_flags, first, None)))
+            else:
+                added = ((r.start_time, r.end_time, r.is_up) for r in islice(reports, first, None))
+            for start_time, end_time, is_up in added:
+                timeline.add(start_time, end_time, is_up)
+
+    def _drop_derived(self) -> None:
+        """
+        Discards bitmaps, retained intervals and indexes built from earlier data.
+        """
+        self.charger_bitmaps.clear()
+        self.station_intervals = None
+        self._interval_tree = None
+        self._prefix_indexes = {}
+        self._timelines = None
+        self._charger_bounds = None
+        self._derived = False
+
+    def invalidate_caches(self) -> None:
+        """
+        Discards everything derived from the reports: retained intervals,
+        timelines, bounds, bitmaps and indexes, and with `incremental` the
+        ingest-time timelines, which are replayed from charger_reports.
+        Call this after changing charger_reports or station_chargers directly
+        instead of through the parsers; calculations otherwise keep using
+        results derived from the earlier data.
+        """
+        self._drop_derived()
+        if self.incremental:
+            self.charger_timelines = {}
+            for charger_id, reports in self.charger_reports.items():
+                timeline = self.charger_timelines[charger_id] = IncrementalTimeline()
+                for start_time, end_time, is_up in _report_rows(reports):
+                    timeline.add(start_time, end_time, is_up)
+
+    def write_snapshot(self, filepath: str) -> None:
+        """
+        Writes the parsed stations and reports to a compact binary snapshot.
+        
+        Layout (little-endian): a fixed header with section counts and offsets,
+        a station table (ID, first member, member count) followed by the flat
+        member charger IDs, a charger table (ID, first report, report count),
+        and the reports as fixed-width start/end/flag columns sorted by charger.
+        Each charger keeps its reports in their original order.
+        
+        Args:
+            filepath: Path of the snapshot file to create
+            
+        Raises:
+            ValueError: If a station, charger or time value does not fit in 64 bits
+        """
+        try:
+            station_table = bytearray()
+            members = array('q')
+            for station_id in sorted(self.station_chargers):
+                charger_ids = sorted(self.station_chargers[station_id])
+                station_table += _SNAPSHOT_ENTRY.pack(station_id, len(members), len(charger_ids))
+                members.extend(charger_ids)
+
+            charger_table = bytearray()
+            start_times, end_times, up_flags = array('q'), array('q'), bytearray()
+            for charger_id in sorted(self.charger_reports):
+                reports = self.charger_reports[charger_id]
+                charger_table += _SNAPSHOT_ENTRY.pack(charger_id, len(up_flags), len(reports))
+                if isinstance(reports, ChargerReportColumns):
+                    start_times.extend(reports.start_times)
+                    end_times.extend(reports.end_times)
+                    up_flags.extend(reports.up_flags)
+                else:
+                    for r in reports:
+                        start_times.append(r.start_time)
+                        end_times.append(r.end_time)
+                        up_flags.append(r.is_up)
+        except (OverflowError, struct.error) as e:
+            raise ValueError(f"Value out of range for snapshot: {str(e)}")
+
+        if sys.byteorder == 'big':
+            for column in (members, start_times, end_times):
+                column.byteswap()
+
+        stations_offset = _SNAPSHOT_HEADER.size
+        members_offset = stations_offset + len(station_table)
+        chargers_offset = members_offset + len(members) * members.itemsize
+        reports_offset = chargers_offset + len(charger_table)
+        with open(filepath, 'wb') as f:
+            f.write(_SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                len(self.station_chargers), len(members), len(self.charger_reports), len(up_flags),
+                stations_offset, members_offset, chargers_offset, reports_offset))
+            f.write(station_table)
+            members.tofile(f)
+            f.write(charger_table)
+            start_times.tofile(f)
+            end_times.tofile(f)
+            f.write(up_flags)
+
+    def load_snapshot(self, filepath: str) -> None:
+        """
+        Loads stations and reports from a snapshot written by write_snapshot.
+        The file is memory-mapped and its columns are copied in bulk, so no
+        text is parsed. An automatic store (columnar=None) that is still empty
+        switches to columns first, so the copies are extended rather than
+        unpacked into one ChargerReport per row.
+        
+        Args:
+            filepath: Path to the snapshot file
+            
+        Raises:
+            ValueError: If the file is not a valid snapshot
+            struct.error: If the snapshot is truncated
+        """
+        with open(filepath, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                (magic, version, n_stations, n_members, n_chargers, n_reports,
+                 stations_offset, members_offset, chargers_offset, reports_offset
+                 ) = _SNAPSHOT_HEADER.unpack_from(mm, 0)
+                if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                    raise ValueError("Unsupported snapshot format")
+                self._prefer_columnar()
+
+                def column(offset: int, count: int, typecode: str) -> array:
+                    values = array(typecode)
+                    end = offset + count * values.itemsize
+                    if end > len(mm):
+                        raise ValueError("Truncated snapshot")
+                    values.frombytes(mm[offset:end])
+                    if sys.byteorder == 'big' and values.itemsize > 1:
+                        values.byteswap()
+                    return values
+
+                def table(offset: int, count: int) -> Iterator[Tuple[int, int, int]]:
+                    return _SNAPSHOT_ENTRY.iter_unpack(mm[offset:offset + count * _SNAPSHOT_ENTRY.size])
+
+                members = column(members_offset, n_members, 'q')
+                for station_id, first, count in table(stations_offset, n_stations):
+                    self._add_station(station_id, set(members[first:first + count]))
+
+                start_times = column(reports_offset, n_reports, 'q')
+                end_times = column(reports_offset + n_reports * 8, n_reports, 'q')
+                up_flags = column(reports_offset + n_reports * 16, n_reports, 'B')
+                for charger_id, first, count in table(chargers_offset, n_chargers):
+                    if self._selected_chargers is not None and charger_id not in self._selected_chargers:
+                        continue
+                    last = first + count
+                    self._add_reports(charger_id, start_times[first:last], end_times[first:last],
+                                      up_flags[first:last])
+
+    def charger_timeline(self, charger_id: int,
+                         memo: Dict[int, Optional[ChargerTimeline]]) -> Optional[ChargerTimeline]:
+        """
+        Returns a charger's normalized timeline, building it on first use.
+        
+        Args:
+            charger_id: Charger to look up
+            memo: Timelines already built during the current calculation
+            
+        Returns:
+            The charger's timeline, or None if it has no reports
+        """
+        if charger_id in memo:
+            return memo[charger_id]
+
+        timeline = None
+        if self.incremental:
+            # Intervals were normalized at ingest; re-sweep only after out-of-order reports
+            tracked = self.charger_timelines.get(charger_id)
+            if tracked is not None:
+                if tracked.stale:
+                    tracked.rebuild(_report_rows(self.charger_reports[charger_id]))
+                timeline = tracked.timeline()
+        else:
+            reports = _report_rows(self.charger_reports.get(charger_id, []))
+            if reports:
+                # Sweep the sorted reports into disjoint up intervals
+                up_intervals = _sweep_charger_reports(reports).intervals()
+                timeline = ChargerTimeline(up_intervals, reports[0][0], max(r[1] for r in reports))
+        memo[charger_id] = timeline
+        return timeline
 
-    def parse_input_file(self, filepath: str) -> None:
+    def calculate_station_uptime(self, window_start: Optional[int] = None,
+                                 window_end: Optional[int] = None) -> List[Tuple[int, int]]:
         """
-        Parses the input file containing station configurations and charger reports.
+        Calculates uptime percentages for all stations with the selected engine.
+        A station is considered up if any of its chargers is up.
+        Without a window, uptime is relative to each station's reporting span.
+        With a window, up intervals are clipped to [window_start, window_end)
+        and uptime is relative to the window length; chargers whose reports
+        all lie outside the window are skipped by their min/max bounds. A
+        window is always evaluated on the sweep-line timelines.
         
         Args:
-            filepath: Path to the input file
+            window_start: Start of the window (inclusive), or None for no window
+            window_end: End of the window (exclusive), or None for no window
+            
+        Returns:
+            List of (station_id, uptime_percentage) tuples, sorted by station_id
             
         Raises:
-            ValueError: If file format is invalid or missing required sections
+            ValueError: If only one window bound is given or the window is empty
         """
-        try:
-            # Read and split file content into lines
-            with open(filepath, 'r') as f:
-                content = f.read().strip().split('\n')
+        if window_start is None and window_end is None:
+            if self.engine is self._sweep_engine:
+                return self._sweep_station_uptime()
+            return self.engine.calculate(self)
+        if window_start is None or window_end is None:
+            raise ValueError("Both window bounds are required")
+        if window_end <= window_start:
+            raise ValueError("Window end must be after window start")
+        return self._windowed_station_uptime(window_start, window_end)
 
-            # Find section markers
-            try:
-                stations_start = content.index('[Stations]')
-                reports_start = content.index('[Charger Availability Reports]')
-            except ValueError:
-                raise ValueError("Missing required sections")
+    def verify_engine(self, engine: Union[str, 'UptimeEngine']) -> List[Tuple[int, int, int]]:
+        """
+        Runs the selected engine and another one on the loaded data and compares them.
+        
+        Args:
+            engine: Engine to check against, as an UptimeEngine or a name from ENGINES
+            
+        Returns:
+            (station_id, selected_engine_uptime, other_engine_uptime) for every
+            station whose results differ, sorted by station_id
+        """
+        return diff_results(self.calculate_station_uptime(), make_engine(engine).calculate(self))
 
-            # Parse Stations section
-            for line in content[stations_start + 1:reports_start]:
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) < 2:
-                        raise ValueError("Invalid station line format")
-                    station_id = int(parts[0])
-                    charger_ids = set(map(int, parts[1:]))
-                    self.station_chargers[station_id] = charger_ids
-
-            # Parse Charger Reports section
-            for line in content[reports_start + 1:]:
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) != 4:
-                        raise ValueError("Invalid report line format")
-                    
-                    charger_id = int(parts[0])
-                    start_time = int(parts[1])
-                    end_time = int(parts[2])
-                    is_up = parts[3].lower() == 'true'
-
-                    # Validate time range
-                    if start_time > end_time:
-                        raise ValueError("Start time cannot be greater than end time")
-
-                    # Create and store report
-                    report = ChargerReport(charger_id, start_time, end_time, is_up)
-                    if charger_id not in self.charger_reports:
-                        self.charger_reports[charger_id] = []
-                    self.charger_reports[charger_id].append(report)
-
-        except (IOError, ValueError, IndexError) as e:
-            raise ValueError(f"Error parsing input file: {str(e)}")
+    def calculate_uptime_series(self, bucket_width: int, series_start: Optional[int] = None,
+                                series_end: Optional[int] = None) -> List[Tuple[int, List[int]]]:
+        """
+        Calculates a dense uptime series per station, e.g. daily or hourly uptime.
+        The series covers [series_start, series_end) in consecutive buckets of
+        bucket_width, the last one possibly shorter. Each station's merged up
+        intervals (kept by the last calculation, or calculated once here) are
+        walked a single time, distributing up time into the buckets, so the
+        whole series costs O(intervals + buckets) per station instead of one
+        windowed calculation per bucket.
+        
+        Args:
+            bucket_width: Bucket size in time units (e.g. 86400 for days in seconds)
+            series_start: Start of the first bucket (default: earliest report start)
+            series_end: End of the last bucket (default: latest report end)
+            
+        Returns:
+            List of (station_id, bucket_uptime_percentages) tuples, sorted by
+            station_id; all series share the same buckets (none for an empty range)
+            
+        Raises:
+            ValueError: If bucket_width is not positive
+        """
+        if bucket_width < 1:
+            raise ValueError("Bucket width must be positive")
+        if self.station_intervals is None:
+            self._sweep_station_uptime()
+        series_start, series_end = self._series_range(series_start, series_end)
+
+        # Length of every bucket; only the last one can be cut short
+        bucket_count = max(0, -(-(series_end - series_start) // bucket_width))
+        lengths = [bucket_width] * bucket_count
+        if bucket_count:
+            lengths[-1] = series_end - (series_start + (bucket_count - 1) * bucket_width)
+
+        results = []
+        for station_id in sorted(self.station_chargers.keys()):
+            if not bucket_count:
+                results.append((station_id, []))
+                continue
+            up_times = _bucket_up_times(self.station_intervals[station_id], series_start, series_end, bucket_width)
+            results.append((station_id, [int((up_time / length) * 100) for up_time, length in zip(up_times, lengths)]))
+        return results
 
-    def _merge_intervals(self, intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    def calculate_rolling_uptime(self, window: int, step: int, series_start: Optional[int] = None,
+                                 series_end: Optional[int] = None) -> List[Tuple[int, List[int]]]:
         """
-        Merges overlapping time intervals into non-overlapping intervals.
+        Calculates a rolling-window uptime series per station, e.g. a 24h window
+        advanced every 5 minutes. Windows [t, t + window) start at series_start
+        and every step after it, as long as they end by series_end. A running
+        up-time total is kept per station: advancing the window adds the up time
+        of the fragment entering at its end and subtracts the fragment leaving
+        at its start, both found by cursors that only move forward over the
+        station's merged intervals. The series costs O(intervals + windows) per
+        station instead of one windowed calculation per window.
         
         Args:
-            intervals: List of (start, end) time tuples
+            window: Window length in time units
+            step: Distance between consecutive window starts
+            series_start: Start of the first window (default: earliest report start)
+            series_end: Latest window end (default: latest report end)
             
         Returns:
-            List of merged non-overlapping intervals
+            List of (station_id, window_uptime_percentages) tuples, sorted by
+            station_id; all series share the same windows (none if the range
+            is shorter than a window)
+            
+        Raises:
+            ValueError: If window or step is not positive
         """
-        if not intervals:
-            return []
+        if window < 1 or step < 1:
+            raise ValueError("Window and step must be positive")
+        if self.station_intervals is None:
+            self._sweep_station_uptime()
+        series_start, series_end = self._series_range(series_start, series_end)
+        window_count = max(0, (series_end - series_start - window) // step + 1)
+
+        results = []
+        for station_id in sorted(self.station_chargers.keys()):
+            intervals = self.station_intervals[station_id]
+            leading, trailing = _UpTimeCursor(intervals, series_start), _UpTimeCursor(intervals, series_start)
+            up_time = leading.advance(series_start + window)
+            series = []
+            for i in range(window_count):
+                if i:
+                    # Slide the window: add the entering fragment, drop the leaving one
+                    window_start = series_start + i * step
+                    up_time += leading.advance(window_start + window)
+                    up_time -= trailing.advance(window_start)
+                series.append(int((up_time / window) * 100))
+            results.append((station_id, series))
+        return results
+
+    def _series_range(self, series_start: Optional[int], series_end: Optional[int]) -> Tuple[int, int]:
+        """
+        Fills in missing series bounds from the earliest report start and latest report end.
+        """
+        if series_start is None or series_end is None:
+            bounds = self._report_bounds()
+            spans = [bounds[charger_id] for charger_ids in self.station_chargers.values()
+                     for charger_id in charger_ids if charger_id in bounds]
+            if series_start is None:
+                series_start = min((start for start, _ in spans), default=0)
+            if series_end is None:
+                series_end = max((end for _, end in spans), default=series_start)
+        return series_start, series_end
+
+    def worst(self, k: int) -> List[Tuple[int, int]]:
+        """
+        Finds the k stations with the lowest uptime, without building the full results.
         
-        # Sort intervals by start time
-        intervals.sort()
+        Args:
+            k: Number of stations to return
+            
+        Returns:
+            Up to k (station_id, uptime_percentage) tuples, lowest uptime first
+            and ties broken by station_id
+            
+        Raises:
+            ValueError: If k is negative
+        """
+        return self._rank_stations(k, lowest=True)
+
+    def best(self, k: int) -> List[Tuple[int, int]]:
+        """
+        Finds the k stations with the highest uptime, without building the full results.
         
-        merged = [intervals[0]]
-        for interval in intervals[1:]:
-            if interval[0] <= merged[-1][1]:
-                # Intervals overlap, update end time
-                merged[-1] = (merged[-1][0], max(merged[-1][1], interval[1]))
+        Args:
+            k: Number of stations to return
+            
+        Returns:
+            Up to k (station_id, uptime_percentage) tuples, highest uptime first
+            and ties broken by station_id
+            
+        Raises:
+            ValueError: If k is negative
+        """
+        return self._rank_stations(k, lowest=False)
+
+    def _rank_stations(self, k: int, lowest: bool) -> List[Tuple[int, int]]:
+        """
+        Keeps the k best-ranked stations in a bounded heap.
+        Once the heap is full, a station is skipped before its chargers'
+        intervals are merged if a bound on its uptime already ranks it behind
+        the heap's last entry: the longest single charger up time bounds the
+        station's up time from below, and the sum of its chargers' up times
+        bounds it from above.
+        """
+        if k < 0:
+            raise ValueError("k must not be negative")
+        if k == 0:
+            return []
+        sign = 1 if lowest else -1
+        # Max-heap of the k smallest (sign * uptime, station_id) keys, stored negated
+        heap: List[Tuple[int, int]] = []
+        timelines: Dict[int, Optional[ChargerTimeline]] = {}
+        up_totals: Dict[int, int] = {}
+
+        for station_id, charger_ids in self.station_chargers.items():
+            if len(heap) == k:
+                min_time = max_time = None
+                charger_up_times = []
+                for charger_id in charger_ids:
+                    timeline = self.charger_timeline(charger_id, timelines)
+                    if timeline is None:
+                        continue
+                    if min_time is None or timeline.start_time < min_time:
+                        min_time = timeline.start_time
+                    if max_time is None or timeline.end_time > max_time:
+                        max_time = timeline.end_time
+                    if charger_id not in up_totals:
+                        up_totals[charger_id] = sum(end - start for start, end in timeline.up_intervals)
+                    charger_up_times.append(up_totals[charger_id])
+                
+                if min_time is not None and min_time != max_time:
+                    total_time = max_time - min_time
+                    bound_time = max(charger_up_times) if lowest else min(total_time, sum(charger_up_times))
+                    bound = int((bound_time / total_time) * 100)
+                    if (sign * bound, station_id) > (-heap[0][0], -heap[0][1]):
+                        continue
+
+            uptime_percentage = self._sweep_engine.station_uptime(self, charger_ids, timelines)
+            entry = (-sign * uptime_percentage, -station_id)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        ranked = sorted((-key, -negated_id) for key, negated_id in heap)
+        return [(station_id, sign * key) for key, station_id in ranked]
+
+    def _windowed_station_uptime(self, window_start: int, window_end: int) -> List[Tuple[int, int]]:
+        """
+        Calculates uptime percentages relative to [window_start, window_end).
+        """
+        bounds = self._report_bounds()
+        if self._timelines is None:
+            self._timelines = {}
+            self._derived = True
+        # Timelines are shared with other windows and calculations until new data arrives
+        timelines = self._timelines
+        results = []
+        window_time = window_end - window_start
+
+        for station_id in sorted(self.station_chargers.keys()):
+            clipped_lists = []
+            for charger_id in self.station_chargers[station_id]:
+                span = bounds.get(charger_id)
+                if span is None or span[1] <= window_start or span[0] >= window_end:
+                    # No report of this charger reaches into the window
+                    continue
+                timeline = self.charger_timeline(charger_id, timelines)
+                clipped_lists.append(_clip_intervals(timeline.up_intervals, window_start, window_end))
+            total_up_time = sum(end - start for start, end in _merge_intervals(clipped_lists))
+            results.append((station_id, int((total_up_time / window_time) * 100)))
+
+        return results
+
+    def _report_bounds(self) -> Dict[int, Tuple[int, int]]:
+        """
+        Returns each charger's (earliest start, latest end) report times.
+        Bounds are kept until new reports arrive, so later windows look up a
+        charger's bounds instead of visiting its reports.
+        """
+        if self._charger_bounds is not None:
+            return self._charger_bounds
+        bounds = {}
+        for charger_id, reports in self.charger_reports.items():
+            if not reports:
+                continue
+            tracked = self.charger_timelines.get(charger_id)
+            if tracked is not None:
+                bounds[charger_id] = (tracked.start_time, tracked.end_time)
+            elif isinstance(reports, ChargerReportColumns):
+                bounds[charger_id] = (min(reports.start_times), max(reports.end_times))
             else:
-                # No overlap, add new interval
-                merged.append(interval)
-        return merged
+                bounds[charger_id] = (min(r.start_time for r in reports), max(r.end_time for r in reports))
+        self._charger_bounds = bounds
+        self._derived = True
+        return bounds
 
-    def calculate_station_uptime(self) -> List[Tuple[int, int]]:
+    def _sweep_station_uptime(self) -> List[Tuple[int, int]]:
         """
-        Calculates uptime percentages for all stations.
-        A station is considered up if any of its chargers is up.
+        Calculates uptime percentages for all stations with the sweep-line
+        engine and keeps its merged station intervals and charger timelines
+        for point queries, series and charger uptimes.
         
         Returns:
             List of (station_id, uptime_percentage) tuples, sorted by station_id
         """
+        results, self.station_intervals, self._timelines = self._sweep_engine.sweep(self)
+        self._interval_tree = None
+        self._prefix_indexes = {}
+        self._derived = True
+        return results
+
+    def stations_up_at(self, time: int) -> List[int]:
+        """
+        Finds the stations that were up at a point in time.
+        Queries a StationIntervalTree over the merged intervals kept by the
+        last calculation (running one first if needed), so each query costs
+        O(log n + k) instead of a recalculation. Intervals are half-open: a
+        station is up at its up intervals' start times but not at their ends.
+        
+        Args:
+            time: Point in time to query
+            
+        Returns:
+            Sorted IDs of the stations up at that time
+        """
+        if self.station_intervals is None:
+            self._sweep_station_uptime()
+        if self._interval_tree is None:
+            self._interval_tree = StationIntervalTree.build(self.station_intervals)
+            if self._interval_tree is None:
+                return []
+        return sorted(station_id for _, _, station_id in self._interval_tree.query(time))
+
+    def calculate_charger_uptime(self) -> List[Tuple[int, int]]:
+        """
+        Calculates uptime percentages for every charger listed by a station,
+        each over its own reporting span. Reuses the charger timelines built
+        by the last calculation, so chargers are not re-sorted or re-swept.
+        
+        Returns:
+            List of (charger_id, uptime_percentage) tuples, sorted by charger_id
+        """
+        timelines = self._timelines if self._timelines is not None else {}
+        charger_ids = set()
+        for station_charger_ids in self.station_chargers.values():
+            charger_ids.update(station_charger_ids)
+
         results = []
+        for charger_id in sorted(charger_ids):
+            timeline = self.charger_timeline(charger_id, timelines)
+            if timeline is None:
+                # Chargers without reports have no uptime, as stations without reports
+                results.append((charger_id, 0))
+            elif timeline.start_time == timeline.end_time:
+                is_up = any(start <= timeline.start_time <= end for start, end in timeline.up_intervals)
+                results.append((charger_id, 100 if is_up else 0))
+            else:
+                total_up_time = sum(end - start for start, end in timeline.up_intervals)
+                total_time = timeline.end_time - timeline.start_time
+                results.append((charger_id, int((total_up_time / total_time) * 100)))
+        return results
+
+    def calculate_station_uptime_bucketed(self, bucket_width: int) -> List[Tuple[int, int]]:
+        """
+        Calculates uptime percentages on time quantized to buckets.
+        Bucket b stands for the time b * bucket_width; it is up for a charger if
+        the charger is up at that time. Each charger's up buckets form a
+        CoverageBitmap, kept in charger_bitmaps until new reports arrive, and a
+        station's coverage is the OR of its chargers' bitmaps. The uptime is the
+        number of up buckets over the buckets within the station's reporting span.
+        With a bucket width of 1, results equal calculate_station_uptime.
+        Stations whose span contains no bucket time are calculated exactly.
         
+        Args:
+            bucket_width: Bucket size in time units (e.g. 60 for 1-minute buckets)
+            
+        Returns:
+            List of (station_id, uptime_percentage) tuples, sorted by station_id
+            
+        Raises:
+            ValueError: If bucket_width is not positive
+        """
+        if bucket_width < 1:
+            raise ValueError("Bucket width must be positive")
+
+        results = []
+        timelines: Dict[int, Optional[ChargerTimeline]] = {}
+        if bucket_width not in self.charger_bitmaps:
+            self.charger_bitmaps[bucket_width] = {}
+            self._derived = True
+        bitmaps = self.charger_bitmaps[bucket_width]
+
         for station_id in sorted(self.station_chargers.keys()):
             charger_ids = self.station_chargers[station_id]
+            coverage = CoverageBitmap()
+            min_time = max_time = None
+            for charger_id in charger_ids:
+                timeline = self.charger_timeline(charger_id, timelines)
+                if timeline is None:
+                    continue
+                if min_time is None or timeline.start_time < min_time:
+                    min_time = timeline.start_time
+                if max_time is None or timeline.end_time > max_time:
+                    max_time = timeline.end_time
+                if charger_id not in bitmaps:
+                    bitmaps[charger_id] = CoverageBitmap.from_intervals(timeline.up_intervals, bucket_width)
+                coverage |= bitmaps[charger_id]
+
+            if min_time is None:
+                results.append((station_id, 0))
+                continue
+
+            total_buckets = -(-max_time // bucket_width) - -(-min_time // bucket_width)
+            if total_buckets == 0:
+                # Instantaneous or shorter than a bucket: no bucket time to sample
+                results.append((station_id, self._sweep_engine.station_uptime(self, charger_ids, timelines)))
+                continue
+            results.append((station_id, int((coverage.count() / total_buckets) * 100)))
+
+        return results
+
+    def uptime(self, station_id: int, window_start: int, window_end: int) -> int:
+        """
+        Calculates a station's uptime percentage within a time window.
+        Uses a prefix-sum index over the merged intervals kept by the last
+        calculation (running one first if needed), so each query costs two
+        bisects instead of a recalculation.
+        
+        Args:
+            station_id: Station to query
+            window_start: Start of the window (inclusive)
+            window_end: End of the window (exclusive)
+            
+        Returns:
+            Percentage of the window the station was up, from 0 to 100
+            
+        Raises:
+            ValueError: If the window is empty or the station is unknown
+        """
+        if window_end <= window_start:
+            raise ValueError("Window end must be after window start")
+        if self.station_intervals is None:
+            self._sweep_station_uptime()
+        index = self._prefix_indexes.get(station_id)
+        if index is None:
+            if station_id not in self.station_intervals:
+                raise ValueError(f"Unknown station ID: {station_id}")
+            index = self._prefix_indexes[station_id] = UptimePrefixIndex(self.station_intervals[station_id])
+        up_time = index.up_time(window_start, window_end)
+        return int((up_time / (window_end - window_start)) * 100)
+
+def _range_max(lo: 'np.ndarray', hi: 'np.ndarray', values: 'np.ndarray', size: int) -> 'np.ndarray':
+    """
+    For every position in [0, size), the maximum of values[i] over all ranges
+    [lo[i], hi[i]) containing it, or the int64 minimum if no range does.
+    Each range is split into two overlapping power-of-two blocks of a sparse
+    table, which is pushed down one level at a time, so the whole batch costs
+    O((n + size) log size) in vectorized passes.
+    """
+    best = np.full(size, np.iinfo(np.int64).min, dtype=np.int64)
+    keep = hi > lo
+    lo, hi, values = lo[keep], hi[keep], values[keep]
+    if not len(lo):
+        return best
+
+    # floor(log2(length)) of every range
+    levels = np.frexp((hi - lo).astype(np.float64))[1] - 1
+    top = int(levels.max())
+    for level in range(top, -1, -1):
+        width = 1 << level
+        if level < top:
+            # A block of 2 * width at i covers the blocks of width at i and i + width
+            np.maximum(best[width:], best[:size - width], out=best[width:])
+        selected = levels == level
+        if selected.any():
+            np.maximum.at(best, lo[selected], values[selected])
+            np.maximum.at(best, hi[selected] - width, values[selected])
+    return best
+
+def _grouped_order(groups: 'np.ndarray', times: 'np.ndarray') -> 'np.ndarray':
+    """
+    Indices that sort entries by (group, time). Uses a single combined int64
+    key when it cannot overflow, which sorts much faster than lexsort.
+    """
+    if not len(times):
+        return np.zeros(0, dtype=np.int64)
+    low = int(times.min())
+    width = int(times.max()) - low + 1
+    if (int(groups.max()) + 1) * width < 2 ** 63:
+        return np.argsort(groups * width + (times - low))
+    return np.lexsort((times, groups))
+
+class UptimeEngine(ABC):
+    """
+    Strategy computing every station's uptime for a StationUptimeCalculator.
+    Engines read the calculator's station_chargers and charger_reports and
+    must all return the same results; they differ only in how they get there.
+    """
+    name = ''
+
+    @abstractmethod
+    def calculate(self, calculator: StationUptimeCalculator) -> List[Tuple[int, int]]:
+        """
+        Calculates uptime percentages for all stations of a calculator.
+        
+        Returns:
+            List of (station_id, uptime_percentage) tuples, sorted by station_id
+        """
+
+class SweepEngine(UptimeEngine):
+    """
+    Sweep-line engine: normalizes each charger's reports once and merges the
+    chargers' up intervals per station (the calculator's built-in algorithm).
+    """
+    name = 'sweep'
+
+    def calculate(self, calculator: StationUptimeCalculator) -> List[Tuple[int, int]]:
+        return self.sweep(calculator)[0]
+
+    def sweep(self, calculator: StationUptimeCalculator
+              ) -> Tuple[List[Tuple[int, int]], Dict[int, List[Tuple[int, int]]],
+                         Dict[int, Optional[ChargerTimeline]]]:
+        """
+        Calculates uptime percentages for all stations from the charger timelines.
+        Each charger's timeline is built once per call and shared by all
+        stations that list the charger.
+        
+        Returns:
+            (results, station_intervals, timelines): the (station_id,
+            uptime_percentage) tuples sorted by station_id, each station's
+            merged up intervals, and the charger timelines that were built
+        """
+        results = []
+        # Charger timelines built so far, shared by every station listing the charger
+        timelines: Dict[int, Optional[ChargerTimeline]] = {}
+        station_intervals: Dict[int, List[Tuple[int, int]]] = {}
+        
+        for station_id in sorted(calculator.station_chargers.keys()):
+            merged = station_intervals[station_id] = []
+            uptime_percentage = self.station_uptime(calculator, calculator.station_chargers[station_id],
+                                                    timelines, merged)
+            results.append((station_id, uptime_percentage))
+
+        return results, station_intervals, timelines
+
+    def station_uptime(self, calculator: StationUptimeCalculator, charger_ids: Iterable[int],
+                       timelines: Dict[int, Optional[ChargerTimeline]],
+                       merged: Optional[List[Tuple[int, int]]] = None) -> int:
+        """
+        Calculates the uptime percentage of a single station.
+        
+        Args:
+            calculator: Calculator holding the station's charger reports
+            charger_ids: The station's chargers
+            timelines: Charger timelines memo shared across stations
+            merged: If given, receives the station's merged up intervals
+            
+        Returns:
+            Uptime percentage from 0 to 100
+        """
+        # Initialize tracking variables
+        min_time = float('inf')
+        max_time = float('-inf')
+        has_reports = False
+        
+        # Track intervals per charger to handle down periods correctly
+        charger_up_intervals = {}  # charger_id -> list of intervals
+        
+        # Process each charger's normalized timeline
+        for charger_id in charger_ids:
+            timeline = calculator.charger_timeline(charger_id, timelines)
+            if timeline is not None:
+                has_reports = True
+                min_time = min(min_time, timeline.start_time)
+                max_time = max(max_time, timeline.end_time)
+                
+                if timeline.up_intervals:
+                    charger_up_intervals[charger_id] = timeline.up_intervals
+        
+        # Handle stations with no reports
+        if not has_reports:
+            return 0
+
+        # Handle instantaneous reports
+        if min_time == max_time:
+            is_up = any(
+                any(start <= min_time <= end for start, end in intervals)
+                for intervals in charger_up_intervals.values()
+            )
+            return 100 if is_up else 0
+
+        # Merge the chargers' sorted up intervals
+        merged_intervals = _merge_intervals(charger_up_intervals.values())
+        if merged is not None:
+            merged.extend(merged_intervals)
+            merged_intervals = merged
+        
+        # Calculate uptime percentage
+        total_up_time = sum(end - start for start, end in merged_intervals)
+        total_time = max_time - min_time
+        return int((total_up_time / total_time) * 100)
+
+class ReferenceEngine(UptimeEngine):
+    """
+    The original straightforward algorithm, kept as a baseline for --verify.
+    Every station re-sorts its chargers' reports, and each down report splits
+    the charger's up intervals collected so far: O(n^2) for n reports per
+    charger in the worst case.
+    """
+    name = 'reference'
+
+    def calculate(self, calculator: StationUptimeCalculator) -> List[Tuple[int, int]]:
+        results = []
+        
+        for station_id in sorted(calculator.station_chargers.keys()):
+            charger_ids = calculator.station_chargers[station_id]
             
             # Initialize tracking variables
             min_time = float('inf')
@@ -129,34 +2190,34 @@ class StationUptimeCalculator:
             
             # Process each charger's reports
             for charger_id in charger_ids:
-                if charger_id in self.charger_reports:
-                    # Sort reports by time, with down reports processed before up reports
-                    reports = sorted(self.charger_reports[charger_id], 
-                                key=lambda x: (x.start_time, not x.is_up))
+                if charger_id in calculator.charger_reports:
+                    # Sort reports by time, with up reports processed before down reports
+                    reports = _report_rows(calculator.charger_reports[charger_id])
+                    reports.sort(key=lambda x: (x[0], not x[2]))
                     if reports:
                         has_reports = True
-                        min_time = min(min_time, min(r.start_time for r in reports))
-                        max_time = max(max_time, max(r.end_time for r in reports))
+                        min_time = min(min_time, reports[0][0])
+                        max_time = max(max_time, max(r[1] for r in reports))
                         
                         # Process reports for this charger
                         charger_intervals = []
-                        for r in reports:
-                            if r.is_up:
+                        for r_start, r_end, r_is_up in reports:
+                            if r_is_up:
                                 # Add new up interval
-                                charger_intervals.append((r.start_time, r.end_time))
+                                charger_intervals.append((r_start, r_end))
                             else:
                                 # Down report splits any overlapping up intervals
                                 new_intervals = []
                                 for start, end in charger_intervals:
-                                    if end <= r.start_time or start >= r.end_time:
+                                    if end <= r_start or start >= r_end:
                                         # No overlap with down period
                                         new_intervals.append((start, end))
                                     else:
                                         # Add non-overlapping parts
-                                        if start < r.start_time:
-                                            new_intervals.append((start, r.start_time))
-                                        if end > r.end_time:
-                                            new_intervals.append((r.end_time, end))
+                                        if start < r_start:
+                                            new_intervals.append((start, r_start))
+                                        if end > r_end:
+                                            new_intervals.append((r_end, end))
                                 charger_intervals = new_intervals
                         
                         if charger_intervals:
@@ -176,13 +2237,12 @@ class StationUptimeCalculator:
                 results.append((station_id, 100 if is_up else 0))
                 continue
 
-            # Combine all up intervals from all chargers
+            # Combine all up intervals from all chargers and merge overlapping ones
             all_intervals = []
             for intervals in charger_up_intervals.values():
                 all_intervals.extend(intervals)
-                
-            # Merge overlapping intervals
-            merged_intervals = self._merge_intervals(all_intervals)
+            all_intervals.sort()
+            merged_intervals = _merge_intervals([all_intervals])
             
             # Calculate uptime percentage
             total_up_time = sum(end - start for start, end in merged_intervals)
@@ -192,24 +2252,409 @@ class StationUptimeCalculator:
 
         return results
 
+class VectorizedEngine(UptimeEngine):
+    """
+    Engine that evaluates every station in a handful of vectorized NumPy
+    passes instead of per-charger Python loops.
+    
+    Reports are loaded into int64 arrays and each charger's report boundaries
+    are coordinate-compressed into elementary segments. A segment is up for a
+    charger when the latest report covering it (in sweep order) is an up
+    report, which reproduces the sweep-line semantics exactly. Station coverage
+    is then the union of its chargers' up runs, measured with a +1/-1
+    difference array and cumsum per station.
+    
+    Results are identical to SweepEngine. Without NumPy, or with times
+    outside +/-TIME_LIMIT, it falls back to the sweep-line calculation.
+    """
+    name = 'vectorized'
+    # Times must stay below this magnitude so that 2 * time + 1 fits in an int64
+    TIME_LIMIT = 2 ** 62
+
+    def calculate(self, calculator: StationUptimeCalculator) -> List[Tuple[int, int]]:
+        if np is None:
+            return SweepEngine().calculate(calculator)
+        try:
+            arrays = self._report_arrays(calculator)
+        except OverflowError:
+            return SweepEngine().calculate(calculator)
+        if arrays is None:
+            return SweepEngine().calculate(calculator)
+        return self._vectorized_uptime(calculator, *arrays)
+
+    def _report_arrays(self, calculator: StationUptimeCalculator) -> Optional[Tuple[List[int], 'np.ndarray', 'np.ndarray', 'np.ndarray', 'np.ndarray']]:
+        """
+        Loads the reports of every charger listed by a station into flat arrays.
+        
+        Returns:
+            (charger_ids, ranks, start_times, end_times, up_flags) where ranks index
+            charger_ids, or None if some time is outside +/-TIME_LIMIT
+            
+        Raises:
+            OverflowError: If a time does not fit in an int64
+        """
+        referenced = set()
+        for charger_ids in calculator.station_chargers.values():
+            referenced.update(charger_ids)
+
+        charger_ids, counts = [], []
+        start_columns, end_columns, flag_columns = [], [], []
+        for charger_id in referenced:
+            reports = calculator.charger_reports.get(charger_id)
+            if not reports:
+                continue
+            if isinstance(reports, ChargerReportColumns):
+                start_columns.append(np.frombuffer(reports.start_times, dtype=np.int64))
+                end_columns.append(np.frombuffer(reports.end_times, dtype=np.int64))
+                flag_columns.append(np.frombuffer(reports.up_flags, dtype=np.uint8))
+            else:
+                start_columns.append(np.array([r.start_time for r in reports], dtype=np.int64))
+                end_columns.append(np.array([r.end_time for r in reports], dtype=np.int64))
+                flag_columns.append(np.array([r.is_up for r in reports], dtype=np.uint8))
+            charger_ids.append(charger_id)
+            counts.append(len(reports))
+
+        if not charger_ids:
+            empty = np.zeros(0, dtype=np.int64)
+            return charger_ids, empty, empty, empty, empty.astype(np.uint8)
+
+        start_times = np.concatenate(start_columns)
+        end_times = np.concatenate(end_columns)
+        if start_times.min() <= -self.TIME_LIMIT or end_times.max() >= self.TIME_LIMIT:
+            return None
+        ranks = np.repeat(np.arange(len(charger_ids)), counts)
+        return charger_ids, ranks, start_times, end_times, np.concatenate(flag_columns)
+
+    def _vectorized_uptime(self, calculator: StationUptimeCalculator, charger_ids: List[int],
+                           ranks: 'np.ndarray', start_times: 'np.ndarray', end_times: 'np.ndarray',
+                           up_flags: 'np.ndarray') -> List[Tuple[int, int]]:
+        """
+        Computes every station's uptime from the flat report arrays.
+        """
+        station_chargers = calculator.station_chargers
+        station_ids = sorted(station_chargers)
+        n_stations = len(station_ids)
+        n_chargers = len(charger_ids)
+
+        # Station-charger membership, restricted to chargers with reports
+        rank_of = {charger_id: rank for rank, charger_id in enumerate(charger_ids)}
+        member_stations, member_ranks = [], []
+        for station_index, station_id in enumerate(station_ids):
+            for charger_id in station_chargers[station_id]:
+                if charger_id in rank_of:
+                    member_stations.append(station_index)
+                    member_ranks.append(rank_of[charger_id])
+        member_stations = np.array(member_stations, dtype=np.int64)
+        member_ranks = np.array(member_ranks, dtype=np.int64)
+
+        has_reports = np.zeros(n_stations, dtype=bool)
+        has_reports[member_stations] = True
+        up_time = np.zeros(n_stations, dtype=np.int64)
+        span_start = np.zeros(n_stations, dtype=np.int64)
+        span_end = np.zeros(n_stations, dtype=np.int64)
+        any_up = np.zeros(n_stations, dtype=bool)
+
+        if n_chargers:
+            # Coordinate compression: sorted unique (charger, time) points
+            point_ranks = np.concatenate((ranks, ranks))
+            point_times = np.concatenate((start_times, end_times))
+            order = _grouped_order(point_ranks, point_times)
+            sorted_ranks, sorted_times = point_ranks[order], point_times[order]
+            is_new = np.ones(len(order), dtype=bool)
+            is_new[1:] = (sorted_ranks[1:] != sorted_ranks[:-1]) | (sorted_times[1:] != sorted_times[:-1])
+            point_index = np.empty(len(order), dtype=np.int64)
+            point_index[order] = np.cumsum(is_new) - 1
+            point_ranks, point_times = sorted_ranks[is_new], sorted_times[is_new]
+
+            # Segment k lies between points k and k + 1; a report covers segments [first, last).
+            # Later sweep keys encode as larger values: 2 * start, plus 1 for down reports.
+            n_reports = len(ranks)
+            keys = 2 * start_times + (1 - up_flags.astype(np.int64))
+            latest = _range_max(point_index[:n_reports], point_index[n_reports:], keys, len(point_times) - 1)
+            covered = (latest != np.iinfo(np.int64).min) & ((latest & 1) == 0)
+
+            # Runs of covered segments are the chargers' disjoint up intervals
+            edges = np.diff(np.concatenate(([0], covered.astype(np.int8), [0])))
+            run_first = np.flatnonzero(edges == 1)
+            run_last = np.flatnonzero(edges == -1)
+            run_ranks = point_ranks[run_first]
+
+            # Copy each up interval to every station listing its charger
+            by_rank = np.argsort(member_ranks, kind='stable')
+            stations_by_rank = member_stations[by_rank]
+            station_counts = np.bincount(member_ranks, minlength=n_chargers)
+            station_offsets = np.concatenate(([0], np.cumsum(station_counts)))
+            copies = station_counts[run_ranks]
+            interval_index = np.repeat(np.arange(len(run_ranks)), copies)
+            within = np.arange(copies.sum()) - np.repeat(np.cumsum(copies) - copies, copies)
+            interval_stations = stations_by_rank[station_offsets[run_ranks][interval_index] + within]
+            interval_starts = point_times[run_first][interval_index]
+            interval_ends = point_times[run_last][interval_index]
+
+            # Union per station: +1/-1 events, cumsum, and the gaps with positive coverage
+            event_stations = np.concatenate((interval_stations, interval_stations))
+            event_times = np.concatenate((interval_starts, interval_ends))
+            event_deltas = np.concatenate((np.ones(len(interval_starts), dtype=np.int64),
+                                           -np.ones(len(interval_ends), dtype=np.int64)))
+            order = _grouped_order(event_stations, event_times)
+            event_stations, event_times = event_stations[order], event_times[order]
+            active = np.cumsum(event_deltas[order])[:-1] > 0
+            active &= event_stations[1:] == event_stations[:-1]
+            np.add.at(up_time, event_stations[:-1][active], np.diff(event_times)[active])
+
+            # Reporting span per station from each charger's first and last point
+            first_point = np.searchsorted(point_ranks, np.arange(n_chargers), 'left')
+            last_point = np.searchsorted(point_ranks, np.arange(n_chargers), 'right') - 1
+            span_start[:] = np.iinfo(np.int64).max
+            span_end[:] = np.iinfo(np.int64).min
+            np.minimum.at(span_start, member_stations, point_times[first_point][member_ranks])
+            np.maximum.at(span_end, member_stations, point_times[last_point][member_ranks])
+
+            # Instantaneous stations are up if any of their chargers reported up
+            charger_any_up = np.zeros(n_chargers, dtype=bool)
+            charger_any_up[ranks[up_flags != 0]] = True
+            any_up[member_stations[charger_any_up[member_ranks]]] = True
+
+        results = []
+        for station_id, reported, up, start, end, instant_up in zip(
+                station_ids, has_reports.tolist(), up_time.tolist(), span_start.tolist(),
+                span_end.tolist(), any_up.tolist()):
+            if not reported:
+                results.append((station_id, 0))
+            elif start == end:
+                results.append((station_id, 100 if instant_up else 0))
+            else:
+                results.append((station_id, int((up / (end - start)) * 100)))
+        return results
+
+class VectorizedUptimeCalculator(StationUptimeCalculator):
+    """
+    Drop-in StationUptimeCalculator that uses the VectorizedEngine.
+    """
+    def __init__(self, columnar: Optional[bool] = None, stations: Optional[Iterable[int]] = None,
+                 incremental: bool = False):
+        super().__init__(columnar=columnar, stations=stations, incremental=incremental,
+                         engine=VectorizedEngine())
+
+# Engines selectable by name
+ENGINES: Dict[str, type] = {engine.name: engine for engine in (SweepEngine, ReferenceEngine, VectorizedEngine)}
+
+def diff_results(expected: List[Tuple[int, int]], actual: List[Tuple[int, int]]) -> List[Tuple[int, int, int]]:
+    """
+    Compares two result lists station by station.
+    
+    Returns:
+        (station_id, expected_uptime, actual_uptime) for every station whose
+        results differ, sorted by station_id; a station missing from one list
+        has None there
+    """
+    expected_by_station = dict(expected)
+    actual_by_station = dict(actual)
+    return [(station_id, expected_by_station.get(station_id), actual_by_station.get(station_id))
+            for station_id in sorted(set(expected_by_station) | set(actual_by_station))
+            if expected_by_station.get(station_id) != actual_by_station.get(station_id)]
+
+def make_engine(engine: Union[str, UptimeEngine, None]) -> UptimeEngine:
+    """
+    Returns an engine instance from an instance, a name from ENGINES, or None for the default.
+    
+    Raises:
+        ValueError: If the name is not a known engine
+    """
+    if engine is None:
+        return SweepEngine()
+    if isinstance(engine, UptimeEngine):
+        return engine
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    return ENGINES[engine]()
+
+class _ArgumentParser(argparse.ArgumentParser):
+    """
+    Argument parser that raises on usage errors instead of exiting,
+    so bad arguments are reported through the regular "ERROR" output.
+    """
+    def error(self, message):
+        raise ValueError(message)
+
+def _parse_id_list(value: str) -> List[int]:
+    """
+    Parses a comma-separated list of integer IDs from the command line.
+    """
+    return [int(part) for part in value.split(',') if part.strip()]
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    """
+    Builds the command line parser.
+    """
+    parser = _ArgumentParser(description="Calculate charging station uptime percentages.")
+    parser.add_argument('input_file', nargs='?', default=STDIN_PATH,
+                        help="Path to the input file ('-' or omitted for stdin)")
+    parser.add_argument('--mmap', dest='use_mmap', action='store_true', default=None,
+                        help="Parse through a memory map (default: automatic for large files)")
+    parser.add_argument('--columnar', action='store_true',
+                        help="Store reports in compact per-charger arrays")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Merge each charger's intervals while parsing (fastest for time-ordered reports)")
+    parser.add_argument('--workers', type=int,
+                        help="Processes used to parse the reports section or shards "
+                             "(0 for one per CPU; default 1, or one per CPU with --reports)")
+    parser.add_argument('--reports', nargs='+', metavar='SHARD',
+                        help="Report shard paths or glob patterns; the input file then only "
+                             "needs the [Stations] section")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default=SweepEngine.name,
+                        help="Algorithm computing the uptimes (default: %(default)s)")
+    parser.add_argument('--verify', choices=sorted(ENGINES), metavar='ENGINE',
+                        help="Also run ENGINE on the same data; report differing stations "
+                             "on stderr and exit with status 1 if any differ")
+    parser.add_argument('--window', type=int, nargs=2, metavar=('START', 'END'),
+                        help="Report uptime within [START, END) instead of each station's reporting span")
+    parser.add_argument('--series', type=int, metavar='WIDTH',
+                        help="Print each station's uptime per consecutive WIDTH-long bucket "
+                             "(over --window if given)")
+    parser.add_argument('--rolling', type=int, nargs=2, metavar=('WINDOW', 'STEP'),
+                        help="Print each station's uptime over WINDOW-long windows advanced "
+                             "by STEP (over --window if given)")
+    ranking = parser.add_mutually_exclusive_group()
+    ranking.add_argument('--worst', type=int, metavar='K',
+                         help="Only print the K stations with the lowest uptime, lowest first")
+    ranking.add_argument('--best', type=int, metavar='K',
+                         help="Only print the K stations with the highest uptime, highest first")
+    parser.add_argument('--chargers', action='store_true',
+                        help="Print each charger's uptime over its own reporting span after the stations")
+    parser.add_argument('--bucket', type=int, metavar='WIDTH',
+                        help="Quantize time to buckets of WIDTH units and compute uptime on bitmaps")
+    parser.add_argument('--up-at', type=int, nargs='+', metavar='TIME',
+                        help="Instead of uptimes, print the stations up at each TIME")
+    parser.add_argument('--stations', type=_parse_id_list, metavar='ID[,ID...]',
+                        help="Only parse and report these stations")
+    parser.add_argument('--cache-dir',
+                        help="Cache parsed input in this directory and reuse it on later runs")
+    parser.add_argument('--cache-max-bytes', type=int, default=DEFAULT_CACHE_MAX_BYTES,
+                        help="Evict least recently used cache entries beyond this total size")
+    return parser
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line and rejects an --engine that the selected output
+    would silently ignore: windows, rankings, buckets, series and point
+    queries are always computed on the sweep-line timelines.
+    
+    Raises:
+        ValueError: On usage errors
+    """
+    parser = _build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.engine != SweepEngine.name:
+        sweep_only = [flag for flag, value in (('--window', args.window), ('--worst', args.worst),
+                                               ('--best', args.best), ('--bucket', args.bucket),
+                                               ('--series', args.series), ('--rolling', args.rolling),
+                                               ('--up-at', args.up_at))
+                      if value is not None]
+        if sweep_only:
+            parser.error(f"--engine {args.engine} does not apply to {sweep_only[0]}")
+    return args
+
+def _build_compile_arg_parser() -> argparse.ArgumentParser:
+    """
+    Builds the command line parser for the `compile` subcommand.
+    """
+    parser = _ArgumentParser(prog="station_uptime.py compile",
+                             description="Convert an input file into a binary snapshot.")
+    parser.add_argument('input_file', help="Path to the input file ('-' for stdin)")
+    parser.add_argument('output_file', help="Path of the snapshot to write")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes used to parse the reports section (0 for one per CPU)")
+    return parser
+
+def compile_main(argv: List[str]) -> None:
+    """
+    Entry point of `station_uptime.py compile <input> <snapshot>`.
+    Parses the input once and writes it as a snapshot that later runs load
+    directly. Outputs nothing on success or "ERROR" on failure.
+    """
+    try:
+        args = _build_compile_arg_parser().parse_args(argv)
+        calculator = StationUptimeCalculator(columnar=True)
+        if args.input_file == STDIN_PATH:
+            calculator.parse_input_stream(sys.stdin.buffer)
+        else:
+            calculator.parse_input_file(args.input_file, workers=args.workers or None)
+        calculator.write_snapshot(args.output_file)
+    except Exception as e:
+        print("ERROR")
+        sys.exit(1)
+
 def main():
     """
     Main entry point. Processes command line arguments and outputs results.
-    Expects a single argument: the path to the input file.
+    Expects the path to the input file (text, compressed or snapshot; '-' or
+    none for stdin), optionally preceded by flags, or the `compile` subcommand.
     Outputs either station uptimes or "ERROR" on failure.
     """
-    if len(sys.argv) != 2:
-        print("ERROR")
-        sys.exit(1)
+    if sys.argv[1:2] == ['compile']:
+        compile_main(sys.argv[2:])
+        return
 
-    calculator = StationUptimeCalculator()
     try:
-        calculator.parse_input_file(sys.argv[1])
-        results = calculator.calculate_station_uptime()
-        
-        # Output results in required format
-        for station_id, uptime in results:
-            print(f"{station_id} {uptime}")
+        args = _parse_args()
+        calculator = StationUptimeCalculator(columnar=args.columnar or None, stations=args.stations,
+                                             incremental=args.incremental, engine=args.engine)
+        if args.reports:
+            calculator.parse_sharded_input(args.input_file, args.reports, workers=args.workers or None)
+        elif args.input_file == STDIN_PATH:
+            calculator.parse_input_stream(sys.stdin.buffer)
+        else:
+            cache = SnapshotCache(args.cache_dir, args.cache_max_bytes) if args.cache_dir else None
+            workers = 1 if args.workers is None else args.workers or None
+            calculator.parse_input_file(args.input_file, use_mmap=args.use_mmap,
+                                        workers=workers, cache=cache)
+        # Full-span results of the selected engine, if the output is made of them
+        exact_results = None
+        if args.up_at:
+            # One line per queried time: the time followed by the stations up at it
+            for time in args.up_at:
+                print(" ".join(str(value) for value in [time] + calculator.stations_up_at(time)))
+        elif args.series is not None:
+            # One line per station: its ID followed by the uptime of each bucket
+            series_range = args.window or (None, None)
+            for station_id, series in calculator.calculate_uptime_series(args.series, *series_range):
+                print(" ".join(str(value) for value in [station_id] + series))
+        elif args.rolling:
+            # One line per station: its ID followed by the uptime of each window
+            series_range = args.window or (None, None)
+            for station_id, series in calculator.calculate_rolling_uptime(*args.rolling, *series_range):
+                print(" ".join(str(value) for value in [station_id] + series))
+        else:
+            if args.worst is not None:
+                results = calculator.worst(args.worst)
+            elif args.best is not None:
+                results = calculator.best(args.best)
+            elif args.bucket is not None:
+                results = calculator.calculate_station_uptime_bucketed(args.bucket)
+            elif args.window:
+                results = calculator.calculate_station_uptime(*args.window)
+            else:
+                results = exact_results = calculator.calculate_station_uptime()
+            
+            # Output results in required format
+            for station_id, uptime in results:
+                print(f"{station_id} {uptime}")
+            if args.chargers:
+                # Charger uptimes follow the stations, separated by the section header
+                print("[Chargers]")
+                for charger_id, uptime in calculator.calculate_charger_uptime():
+                    print(f"{charger_id} {uptime}")
+
+        if args.verify:
+            # The check covers the full-span calculation whatever the output mode
+            expected = exact_results if exact_results is not None else calculator.calculate_station_uptime()
+            mismatches = diff_results(expected, make_engine(args.verify).calculate(calculator))
+            for station_id, uptime, other_uptime in mismatches:
+                print(f"MISMATCH {station_id} {args.engine}={uptime} {args.verify}={other_uptime}",
+                      file=sys.stderr)
+            if mismatches:
+                sys.exit(1)
             
     except Exception as e:
         print("ERROR")
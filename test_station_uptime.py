@@ -1,7 +1,26 @@
 import unittest
 import tempfile
 import os
-from station_uptime import StationUptimeCalculator, ChargerReport
+import shutil
+import io
+import bz2
+import gzip
+import lzma
+import mmap
+import random
+import sys
+from unittest import mock
+import station_uptime
+from station_uptime import (StationUptimeCalculator, ChargerReport, ChargerReportColumns, SnapshotCache,
+                            UpIntervalSet, VectorizedUptimeCalculator, CoverageBitmap)
+
+# Example input shipped next to this file, found independently of the working directory
+EXAMPLE_INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'input_1.txt')
+
+# Report stores and modes the randomized tests run against
+STORE_OPTIONS = ({'columnar': False, 'incremental': False},
+                 {'columnar': True, 'incremental': False},
+                 {'columnar': False, 'incremental': True})
 
 class TestStationUptimeCalculator(unittest.TestCase):
     """
@@ -42,6 +61,73 @@ class TestStationUptimeCalculator(unittest.TestCase):
             f.write(content)
         return path
 
+    def random_reports(self, rng: random.Random, chargers: int, max_time: int, max_reports: int = 25,
+                       up_probability: float = 0.6) -> list:
+        """
+        Helper method to draw random reports, including overlapping, touching,
+        zero-duration and out-of-order ones.
+        
+        Args:
+            rng: Random source
+            chargers: Reports go to charger IDs 0 to chargers - 1
+            max_time: Latest report time
+            max_reports: Largest number of reports drawn
+            up_probability: Chance of each report being an up report
+            
+        Returns:
+            List of (charger_id, start_time, end_time, is_up) tuples
+        """
+        reports = []
+        for _ in range(rng.randint(0, max_reports)):
+            start, end = sorted((rng.randint(0, max_time), rng.randint(0, max_time)))
+            reports.append((rng.randrange(chargers), start, end, rng.random() < up_probability))
+        return reports
+
+    def random_topology(self, rng: random.Random, max_time: int, max_chargers: int = 6, max_stations: int = 5,
+                        max_reports: int = 25, up_probability: float = 0.6, id_space: int = None) -> tuple:
+        """
+        Helper method to draw random stations over shared chargers plus their reports.
+        One charger ID beyond the stations' chargers also receives reports.
+        
+        Args:
+            rng: Random source
+            max_time: Latest report time
+            max_chargers: Largest number of chargers listed by stations
+            max_stations: Largest number of stations
+            max_reports: Largest number of reports drawn
+            up_probability: Chance of each report being an up report
+            id_space: Draw station IDs from range(id_space) instead of numbering them from 0
+            
+        Returns:
+            (station_chargers, reports) with reports as from random_reports
+        """
+        chargers = rng.randint(1, max_chargers)
+        station_ids = (range(rng.randint(1, max_stations)) if id_space is None
+                       else rng.sample(range(id_space), rng.randint(1, max_stations)))
+        stations = {station_id: set(rng.sample(range(chargers), rng.randint(1, chargers)))
+                    for station_id in station_ids}
+        return stations, self.random_reports(rng, chargers + 1, max_time, max_reports, up_probability)
+
+    def build_calculator(self, stations: dict, reports: list, calculator_class: type = StationUptimeCalculator,
+                         **options) -> StationUptimeCalculator:
+        """
+        Helper method to create a calculator holding the given stations and reports.
+        
+        Args:
+            stations: Station ID -> set of charger IDs
+            reports: (charger_id, start_time, end_time, is_up) tuples, added in order
+            calculator_class: Calculator class to instantiate
+            options: Keyword arguments for the calculator
+            
+        Returns:
+            The populated calculator
+        """
+        calculator = calculator_class(**options)
+        calculator.station_chargers = stations
+        for report in reports:
+            calculator._add_report(*report)
+        return calculator
+
     def test_basic_single_charger(self):
         """
         Tests the simplest case - a single charger that's up for its entire reporting period.
@@ -270,5 +356,1094 @@ class TestStationUptimeCalculator(unittest.TestCase):
         results = self.calculator.calculate_station_uptime()
         self.assertEqual(results, [(0, 100)])
 
+    def test_missing_reports_section(self):
+        """
+        Tests error handling for a file with stations but no reports header.
+        Expected: ValueError as the reports section is required.
+        """
+        input_content = """[Stations]
+0 1000"""
+        
+        input_file = self.create_temp_file(input_content)
+        with self.assertRaises(ValueError):
+            self.calculator.parse_input_file(input_file)
+
+    def test_sections_out_of_order(self):
+        """
+        Tests error handling for a reports section placed before the stations section.
+        Expected: ValueError as station definitions must come first.
+        """
+        input_content = """[Charger Availability Reports]
+1000 0 100 true
+
+[Stations]
+0 1000"""
+        
+        input_file = self.create_temp_file(input_content)
+        with self.assertRaises(ValueError):
+            self.calculator.parse_input_file(input_file)
+
+    def test_headers_match_whole_lines(self):
+        """
+        Tests that section headers must be the whole line, except for whitespace at
+        the very start and end of the file, for the text and memory-mapped parsers.
+        Expected: ValueError for padded headers inside the file; results otherwise.
+        """
+        reports = "1000 0 100 true\n"
+        rejected = ("export\n [Stations]\n0 1000\n[Charger Availability Reports]\n" + reports,
+                    "[Stations]\n0 1000\n[Charger Availability Reports]  \n" + reports,
+                    "[Stations]\n0 1000\n  [Charger Availability Reports]",
+                    "[Stations]\n0 1000\n[Charger Availability Reports] \n\n[Charger Availability Reports]\n")
+        accepted = ("\n  [Stations]\r\n0 1000\r\n[Charger Availability Reports]\r\n" + reports,
+                    "[Stations]\n0 1000\n[Charger Availability Reports]  \n \n")
+        for use_mmap in (False, True):
+            for input_content in rejected:
+                input_file = self.create_temp_file(input_content)
+                with self.assertRaises(ValueError):
+                    StationUptimeCalculator().parse_input_file(input_file, use_mmap=use_mmap)
+            for input_content, expected in zip(accepted, ([(0, 100)], [(0, 0)])):
+                calculator = StationUptimeCalculator()
+                calculator.parse_input_file(self.create_temp_file(input_content), use_mmap=use_mmap)
+                self.assertEqual(calculator.calculate_station_uptime(), expected)
+
+    def test_preamble_and_blank_lines_ignored(self):
+        """
+        Tests that lines before [Stations] and blank lines inside sections are skipped.
+        Expected: 100% uptime, parsed exactly as if the extra lines were absent.
+        """
+        input_content = """generated by nightly export
+
+[Stations]
+
+0 1000
+
+[Charger Availability Reports]
+
+1000 0 100 true
+
+"""
+        
+        input_file = self.create_temp_file(input_content)
+        self.calculator.parse_input_file(input_file)
+        self.assertEqual(self.calculator.station_chargers, {0: {1000}})
+        self.assertEqual(self.calculator.calculate_station_uptime(), [(0, 100)])
+
+    def test_mmap_parser_matches_text_parser(self):
+        """
+        Tests that the memory-mapped bytes parser builds the same state as the text parser.
+        Expected: identical stations, reports and uptime results, also when the reports
+        are tokenized in several blocks and a charger ID is written with a leading zero.
+        """
+        input_content = """[Stations]
+0 1001 1002
+1 1003
+
+[Charger Availability Reports]
+1001 0 50000 true
+1002 50000 100000 TRUE
+1003 25000 75000 false
+01001 50000 60000 false
+1003 75000 90000 true
+"""
+        
+        input_file = self.create_temp_file(input_content)
+        self.calculator.parse_input_file(input_file, use_mmap=False)
+        mapped = StationUptimeCalculator()
+        with mock.patch.object(station_uptime, 'REPORT_BLOCK_BYTES', 20):
+            mapped.parse_input_file(input_file, use_mmap=True)
+        
+        self.assertEqual(mapped.station_chargers, self.calculator.station_chargers)
+        self.assertEqual(
+            {cid: [(r.start_time, r.end_time, r.is_up) for r in reports]
+             for cid, reports in mapped.charger_reports.items()},
+            {cid: [(r.start_time, r.end_time, r.is_up) for r in reports]
+             for cid, reports in self.calculator.charger_reports.items()})
+        self.assertEqual(mapped.calculate_station_uptime(), self.calculator.calculate_station_uptime())
+
+    def test_mmap_parser_keeps_times_beyond_64_bits(self):
+        """
+        Tests the automatic store when a report time does not fit in 64 bits,
+        for a sequential and a parallel memory-mapped parse.
+        Expected: report objects and the same results as the text parser.
+        """
+        input_content = f"""[Stations]
+0 1000
+1 1001
+
+[Charger Availability Reports]
+1000 0 50 true
+1000 50 100 false
+1001 0 {2 ** 64} true
+"""
+        
+        input_file = self.create_temp_file(input_content)
+        self.calculator.parse_input_file(input_file, use_mmap=False)
+        expected = self.calculator.calculate_station_uptime()
+        with mock.patch.object(station_uptime, 'MIN_PARALLEL_CHUNK_BYTES', 1):
+            for options in ({'use_mmap': True}, {'workers': 2}):
+                mapped = StationUptimeCalculator()
+                mapped.parse_input_file(input_file, **options)
+                self.assertIsInstance(mapped.charger_reports[1000], list)
+                self.assertEqual(mapped.calculate_station_uptime(), expected)
+
+    def test_mmap_parser_errors(self):
+        """
+        Tests that the memory-mapped parser rejects the same malformed inputs.
+        Expected: ValueError for missing sections, bad report lines, bad time ranges and empty files.
+        """
+        for input_content in ("Invalid content",
+                              "",
+                              "[Stations]\n0\n\n[Charger Availability Reports]",
+                              "[Stations]\n0 1000\n\n[Charger Availability Reports]\n1000 0 100",
+                              "[Stations]\n0 1000\n\n[Charger Availability Reports]\nabc 0 100 true",
+                              "[Stations]\n0 1000\n\n[Charger Availability Reports]\n1000 100 0 true"):
+            input_file = self.create_temp_file(input_content)
+            with self.assertRaises(ValueError):
+                StationUptimeCalculator().parse_input_file(input_file, use_mmap=True)
+
+    def test_chunk_ranges_align_on_lines(self):
+        """
+        Tests that the reports section is split into contiguous ranges starting at line starts.
+        Expected: ranges cover the whole section and every boundary follows a newline.
+        """
+        content = b"1000 0 10 true\n1001 5 20 false\n\n1002 0 1 true\n1003 0 2 true"
+        input_file = self.create_temp_file(content.decode())
+        with open(input_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for chunks in range(1, 8):
+                    ranges = station_uptime._chunk_ranges(mm, 0, len(mm), chunks)
+                    self.assertEqual(ranges[0][0], 0)
+                    self.assertEqual(ranges[-1][1], len(mm))
+                    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+                        self.assertEqual(end, start)
+                        self.assertEqual(content[start - 1:start], b"\n")
+
+    def test_parallel_parse_matches_sequential(self):
+        """
+        Tests parsing the reports section in a process pool.
+        Expected: per-charger reports merged in file order and identical uptime results.
+        """
+        lines = ["[Stations]", "0 1000 1001", "1 1002", "", "[Charger Availability Reports]"]
+        for i in range(60):
+            lines.append(f"{1000 + i % 3} {i * 10} {i * 10 + 15} {'true' if i % 4 else 'false'}")
+        input_file = self.create_temp_file("\n".join(lines))
+        
+        self.calculator.parse_input_file(input_file)
+        parallel = StationUptimeCalculator()
+        with mock.patch.object(station_uptime, 'MIN_PARALLEL_CHUNK_BYTES', 1):
+            parallel.parse_input_file(input_file, workers=3)
+        
+        self.assertEqual(
+            {cid: [(r.start_time, r.end_time, r.is_up) for r in reports]
+             for cid, reports in parallel.charger_reports.items()},
+            {cid: [(r.start_time, r.end_time, r.is_up) for r in reports]
+             for cid, reports in self.calculator.charger_reports.items()})
+        self.assertEqual(parallel.calculate_station_uptime(), self.calculator.calculate_station_uptime())
+
+    def test_parallel_parse_error_in_any_chunk(self):
+        """
+        Tests that a malformed line in a late chunk still fails the whole parse.
+        Expected: ValueError from the parallel parser.
+        """
+        lines = ["[Stations]", "0 1000", "", "[Charger Availability Reports]"]
+        lines += [f"1000 {i} {i + 1} true" for i in range(40)]
+        lines.append("1000 50 40 true")
+        input_file = self.create_temp_file("\n".join(lines))
+        with mock.patch.object(station_uptime, 'MIN_PARALLEL_CHUNK_BYTES', 1):
+            with self.assertRaises(ValueError):
+                self.calculator.parse_input_file(input_file, workers=4)
+
+    def test_columnar_store_matches_list_store(self):
+        """
+        Tests the array-backed report store against the default list store.
+        Expected: reports kept as ChargerReportColumns and identical uptime results.
+        """
+        input_content = """[Stations]
+0 0
+1 1
+2 0 1
+
+[Charger Availability Reports]
+0 10 20 true
+0 20 30 false
+0 30 40 true
+1 0 1 true
+1 5 25 false"""
+        
+        input_file = self.create_temp_file(input_content)
+        self.calculator.parse_input_file(input_file)
+        columnar = StationUptimeCalculator(columnar=True)
+        columnar.parse_input_file(input_file)
+        
+        self.assertIsInstance(columnar.charger_reports[0], ChargerReportColumns)
+        self.assertEqual(list(columnar.charger_reports[0].up_flags), [1, 0, 1])
+        self.assertEqual([(r.start_time, r.end_time, r.is_up) for r in columnar.charger_reports[1]],
+                         [(0, 1, True), (5, 25, False)])
+        self.assertEqual(columnar.calculate_station_uptime(), self.calculator.calculate_station_uptime())
+
+    def test_columnar_store_time_out_of_range(self):
+        """
+        Tests that times beyond the 64-bit columns are rejected.
+        Expected: ValueError instead of a truncated or partially stored report.
+        """
+        input_content = f"""[Stations]
+0 1000
+
+[Charger Availability Reports]
+1000 0 {2 ** 63} true"""
+        
+        input_file = self.create_temp_file(input_content)
+        with self.assertRaises(ValueError):
+            StationUptimeCalculator(columnar=True).parse_input_file(input_file)
+
+    def test_compressed_input(self):
+        """
+        Tests transparent decompression of gzip, bz2 and xz input files.
+        Expected: the same results as the plain text file for every format.
+        """
+        input_content = """[Stations]
+0 1001 1002
+1 1003
+2 1004
+
+[Charger Availability Reports]
+1001 0 50000 true
+1001 50000 100000 true
+1002 50000 100000 true
+1003 25000 75000 false
+1004 0 50000 true
+1004 100000 200000 true"""
+        
+        for compress in (gzip.compress, bz2.compress, lzma.compress):
+            input_file = self.create_temp_file("")
+            with open(input_file, 'wb') as f:
+                f.write(compress(input_content.encode()))
+            calculator = StationUptimeCalculator()
+            calculator.parse_input_file(input_file, workers=4)
+            self.assertEqual(calculator.calculate_station_uptime(), [(0, 100), (1, 0), (2, 75)])
+
+    def test_corrupt_compressed_input(self):
+        """
+        Tests error handling for truncated and corrupted compressed input, read as
+        a file, from a stream and as a report shard.
+        Expected: ValueError rather than a decompression-specific exception.
+        """
+        data = "[Stations]\n0 1000\n\n[Charger Availability Reports]\n1000 0 100 true\n" * 50
+        stations_file = self.create_temp_file("[Stations]\n0 1000\n")
+        for compress in (gzip.compress, bz2.compress, lzma.compress):
+            compressed = compress(data.encode())
+            corrupted = compressed[:20] + bytes(b ^ 0xFF for b in compressed[20:60]) + compressed[60:]
+            for content in (compressed[:30], corrupted):
+                input_file = self.create_temp_file("")
+                with open(input_file, 'wb') as f:
+                    f.write(content)
+                with self.assertRaises(ValueError):
+                    StationUptimeCalculator().parse_input_file(input_file)
+                with self.assertRaises(ValueError):
+                    StationUptimeCalculator().parse_input_stream(io.BytesIO(content))
+                with self.assertRaises(ValueError):
+                    StationUptimeCalculator().parse_sharded_input(stations_file, [input_file], workers=1)
+
+    def test_snapshot_round_trip(self):
+        """
+        Tests compiling parsed input into a binary snapshot and loading it back.
+        Expected: identical stations, per-charger report order and results for both stores,
+        with the automatic store loading into columns.
+        """
+        input_content = """[Stations]
+0 1001 1002
+1 1003
+2 1004
+
+[Charger Availability Reports]
+1004 100000 200000 true
+1001 0 50000 true
+1003 25000 75000 false
+1001 50000 100000 true
+1002 50000 100000 true
+1004 0 50000 true"""
+        
+        input_file = self.create_temp_file(input_content)
+        self.calculator.parse_input_file(input_file)
+        snapshot_file = self.create_temp_file("")
+        self.calculator.write_snapshot(snapshot_file)
+        
+        for columnar in (False, True, None):
+            loaded = StationUptimeCalculator(columnar=columnar)
+            loaded.parse_input_file(snapshot_file)
+            self.assertEqual(isinstance(loaded.charger_reports[1004], ChargerReportColumns), columnar is not False)
+            self.assertEqual(loaded.station_chargers, self.calculator.station_chargers)
+            self.assertEqual([(r.start_time, r.end_time, r.is_up) for r in loaded.charger_reports[1004]],
+                             [(100000, 200000, True), (0, 50000, True)])
+            self.assertEqual(loaded.calculate_station_uptime(), [(0, 100), (1, 0), (2, 75)])
+
+    def test_truncated_snapshot(self):
+        """
+        Tests error handling for a snapshot cut short.
+        Expected: ValueError when loading it through parse_input_file.
+        """
+        input_content = """[Stations]
+0 1000
+
+[Charger Availability Reports]
+1000 0 100 true"""
+        
+        input_file = self.create_temp_file(input_content)
+        self.calculator.parse_input_file(input_file)
+        snapshot_file = self.create_temp_file("")
+        self.calculator.write_snapshot(snapshot_file)
+        with open(snapshot_file, 'rb') as f:
+            data = f.read()
+        for length in (len(station_uptime.SNAPSHOT_MAGIC), len(data) - 1):
+            with open(snapshot_file, 'wb') as f:
+                f.write(data[:length])
+            with self.assertRaises(ValueError):
+                StationUptimeCalculator().parse_input_file(snapshot_file)
+
+    def test_parse_cache_hit_skips_parsing(self):
+        """
+        Tests that a second parse of an unchanged file loads the cached snapshot.
+        Expected: no text parsing on the second run and identical results;
+        a modified file misses the cache.
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        cache = SnapshotCache(cache_dir)
+        input_file = self.create_temp_file("""[Stations]
+0 1000
+
+[Charger Availability Reports]
+1000 0 50 true
+1000 75 100 true""")
+        
+        self.calculator.parse_input_file(input_file, cache=cache)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        
+        cached = StationUptimeCalculator()
+        with mock.patch.object(StationUptimeCalculator, '_parse_lines', side_effect=AssertionError):
+            cached.parse_input_file(input_file, cache=cache)
+        self.assertEqual(cached.calculate_station_uptime(), [(0, 75)])
+        
+        with open(input_file, 'a') as f:
+            f.write("\n1000 50 75 true")
+        changed = StationUptimeCalculator()
+        changed.parse_input_file(input_file, cache=cache)
+        self.assertEqual(changed.calculate_station_uptime(), [(0, 100)])
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_parse_cache_eviction(self):
+        """
+        Tests the size bound of the parse cache.
+        Expected: least recently used snapshots are evicted to stay within max_bytes.
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        cache = SnapshotCache(cache_dir)
+        paths = []
+        for i in range(3):
+            input_file = self.create_temp_file(f"[Stations]\n0 1000\n\n[Charger Availability Reports]\n1000 0 {i + 1} true")
+            StationUptimeCalculator().parse_input_file(input_file, cache=cache)
+            path = os.path.join(cache_dir, cache.key(input_file) + SnapshotCache.SUFFIX)
+            # Last-use times one second apart, oldest first
+            os.utime(path, (1000 + i, 1000 + i))
+            paths.append(path)
+        
+        cache.max_bytes = sum(os.path.getsize(path) for path in paths[1:])
+        cache.evict()
+        self.assertEqual(sorted(os.listdir(cache_dir)), sorted(os.path.basename(path) for path in paths[1:]))
+
+    def test_parse_input_stream(self):
+        """
+        Tests parsing from binary streams, plain and gzip-compressed, as read from stdin.
+        Expected: the same results as parsing the equivalent file.
+        """
+        input_content = b"""[Stations]
+0 0
+1 1
+
+[Charger Availability Reports]
+0 10 20 true
+0 20 30 false
+0 30 40 true
+1 0 1 true"""
+        
+        for data in (input_content, gzip.compress(input_content)):
+            calculator = StationUptimeCalculator()
+            calculator.parse_input_stream(io.BytesIO(data))
+            self.assertEqual(calculator.calculate_station_uptime(), [(0, 66), (1, 100)])
+
+    def test_parse_input_stream_errors(self):
+        """
+        Tests error handling for malformed streamed input.
+        Expected: ValueError for a missing section and for a snapshot piped in.
+        """
+        for data in (b"[Stations]\n0 1000\n", station_uptime.SNAPSHOT_MAGIC + b"\0" * 64):
+            with self.assertRaises(ValueError):
+                StationUptimeCalculator().parse_input_stream(io.BytesIO(data))
+
+    def test_sharded_input(self):
+        """
+        Tests a stations-only file combined with report shards given as a glob.
+        Expected: the same results as the single-file input, serially and in a worker pool.
+        """
+        shard_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, shard_dir)
+        stations_file = self.create_temp_file("[Stations]\n0 1001 1002\n1 1003\n2 1004\n")
+        shards = {
+            "00.txt": "[Charger Availability Reports]\n1001 0 50000 true\n1004 0 50000 true\n",
+            "01.txt": "1001 50000 100000 true\n1002 50000 100000 true\n",
+            "02.txt": "\n1003 25000 75000 false\n1004 100000 200000 true",
+        }
+        for name, content in shards.items():
+            with open(os.path.join(shard_dir, name), 'w') as f:
+                f.write(content)
+        
+        for workers in (1, 2):
+            calculator = StationUptimeCalculator()
+            calculator.parse_sharded_input(stations_file, [os.path.join(shard_dir, "*.txt")], workers=workers)
+            self.assertEqual([(r.start_time, r.end_time) for r in calculator.charger_reports[1004]],
+                             [(0, 50000), (100000, 200000)])
+            self.assertEqual(calculator.calculate_station_uptime(), [(0, 100), (1, 0), (2, 75)])
+
+    def test_sharded_input_errors(self):
+        """
+        Tests error handling for sharded input.
+        Expected: ValueError for an unmatched glob, a malformed shard line and a
+        header that is not at the start of a shard.
+        """
+        stations_file = self.create_temp_file("[Stations]\n0 1000\n")
+        missing = os.path.join(tempfile.gettempdir(), "no-such-shards-*.txt")
+        bad_line = self.create_temp_file("1000 0 100 true\n1000 0 100\n")
+        late_header = self.create_temp_file("1000 0 100 true\n[Charger Availability Reports]\n")
+        for shards in ([missing], [bad_line], [late_header]):
+            with self.assertRaises(ValueError):
+                StationUptimeCalculator().parse_sharded_input(stations_file, shards, workers=1)
+
+    def test_station_filtered_parsing(self):
+        """
+        Tests parsing restricted to selected stations, for every reader.
+        Expected: only the selected stations and their chargers' reports are kept,
+        and their uptimes match the unfiltered run.
+        """
+        input_content = """[Stations]
+0 1001 1002
+1 1003
+2 1004
+
+[Charger Availability Reports]
+1001 0 50000 true
+1001 50000 100000 true
+1002 50000 100000 true
+1003 25000 75000 false
+1003 this line is ignored
+1004 0 50000 true
+1004 100000 200000 true"""
+        
+        input_file = self.create_temp_file(input_content)
+        for options in ({'use_mmap': False}, {'use_mmap': True}, {'workers': 3}):
+            calculator = StationUptimeCalculator(stations=[0, 2])
+            with mock.patch.object(station_uptime, 'MIN_PARALLEL_CHUNK_BYTES', 1):
+                calculator.parse_input_file(input_file, **options)
+            self.assertEqual(set(calculator.station_chargers), {0, 2})
+            self.assertEqual(set(calculator.charger_reports), {1001, 1002, 1004})
+            self.assertEqual(calculator.calculate_station_uptime(), [(0, 100), (2, 75)])
+
+    def test_station_filtered_snapshot_load(self):
+        """
+        Tests loading a snapshot with a station selection.
+        Expected: chargers of unselected stations are skipped.
+        """
+        input_content = """[Stations]
+0 1000
+1 1001
+
+[Charger Availability Reports]
+1000 0 100 true
+1001 0 100 false"""
+        
+        input_file = self.create_temp_file(input_content)
+        self.calculator.parse_input_file(input_file)
+        snapshot_file = self.create_temp_file("")
+        self.calculator.write_snapshot(snapshot_file)
+        
+        calculator = StationUptimeCalculator(stations=[1])
+        calculator.parse_input_file(snapshot_file)
+        self.assertEqual(set(calculator.charger_reports), {1001})
+        self.assertEqual(calculator.calculate_station_uptime(), [(1, 0)])
+
+    def test_down_report_ordering(self):
+        """
+        Tests which up reports a down report cuts.
+        A down report removes up time from up reports starting at or before it;
+        an up report starting inside an earlier down period is kept.
+        
+        Station 0: up 0-100 cut by down 20-40 and down 60-80 (60%)
+        Station 1: down 0-100, then up 50-100 starting inside it (50%)
+        """
+        input_content = """[Stations]
+0 1000
+1 1001
+
+[Charger Availability Reports]
+1000 60 80 false
+1000 0 100 true
+1000 20 40 false
+1001 0 100 false
+1001 50 100 true"""
+        
+        input_file = self.create_temp_file(input_content)
+        self.calculator.parse_input_file(input_file)
+        results = self.calculator.calculate_station_uptime()
+        self.assertEqual(results, [(0, 60), (1, 50)])
+
+    def test_flapping_charger(self):
+        """
+        Tests a charger with thousands of alternating up and down reports
+        layered over one long up report.
+        Expected: the down reports cut out half of every 20-unit cycle (50%).
+        """
+        lines = ["[Stations]", "0 1000", "", "[Charger Availability Reports]", "1000 0 200000 true"]
+        for start in range(0, 200000, 20):
+            lines.append(f"1000 {start} {start + 10} true")
+            lines.append(f"1000 {start + 10} {start + 20} false")
+        
+        input_file = self.create_temp_file("\n".join(lines))
+        self.calculator.parse_input_file(input_file)
+        results = self.calculator.calculate_station_uptime()
+        self.assertEqual(results, [(0, 50)])
+
+    def test_up_interval_set(self):
+        """
+        Tests the bisect-maintained interval set directly.
+        Expected: overlapping and touching adds merge, cuts split, touching cuts keep intervals.
+        """
+        intervals = UpIntervalSet()
+        intervals.add(10, 20)
+        intervals.add(30, 40)
+        intervals.add(20, 25)
+        self.assertEqual(intervals.intervals(), [(10, 25), (30, 40)])
+        intervals.subtract(15, 35)
+        self.assertEqual(intervals.intervals(), [(10, 15), (35, 40)])
+        intervals.subtract(40, 50)
+        intervals.subtract(0, 10)
+        self.assertEqual(intervals.intervals(), [(10, 15), (35, 40)])
+        intervals.add(0, 100)
+        self.assertEqual(intervals.intervals(), [(0, 100)])
+
+    def test_shared_charger_timeline_built_once(self):
+        """
+        Tests that a charger listed by several stations is normalized only once.
+        Expected: one sweep per charger with reports, and correct per-station results.
+        """
+        input_content = """[Stations]
+0 1000 1001
+1 1000
+2 1001 1002
+
+[Charger Availability Reports]
+1000 0 50 true
+1001 50 100 true
+1002 0 100 false"""
+        
+        input_file = self.create_temp_file(input_content)
+        self.calculator.parse_input_file(input_file)
+        sweep = station_uptime._sweep_charger_reports
+        with mock.patch.object(station_uptime, '_sweep_charger_reports', side_effect=sweep) as counted:
+            results = self.calculator.calculate_station_uptime()
+        self.assertEqual(counted.call_count, 3)
+        self.assertEqual(results, [(0, 100), (1, 100), (2, 50)])
+
+    def test_incremental_timelines(self):
+        """
+        Tests ingest-time normalization of charger timelines.
+        Expected: the same results as query-time normalization, no re-sweep for
+        chargers whose reports arrived in order, and one re-sweep for a charger
+        that received an out-of-order report.
+        """
+        input_content = """[Stations]
+0 1000 1001
+1 1001
+
+[Charger Availability Reports]
+1000 0 50 true
+1000 20 30 false
+1000 40 80 true
+1001 50 100 true
+1001 0 100 false
+1001 60 70 false"""
+        
+        input_file = self.create_temp_file(input_content)
+        self.calculator.parse_input_file(input_file)
+        for columnar in (False, True):
+            incremental = StationUptimeCalculator(columnar=columnar, incremental=True)
+            incremental.parse_input_file(input_file)
+            self.assertFalse(incremental.charger_timelines[1000].stale)
+            self.assertTrue(incremental.charger_timelines[1001].stale)
+            
+            sweep = station_uptime._sweep_charger_reports
+            with mock.patch.object(station_uptime, '_sweep_charger_reports', side_effect=sweep) as counted:
+                first = incremental.calculate_station_uptime()
+                second = incremental.calculate_station_uptime()
+            self.assertEqual(counted.call_count, 1)
+            self.assertEqual(first, self.calculator.calculate_station_uptime())
+            self.assertEqual(second, [(0, 90), (1, 40)])
+
+    def test_merge_intervals_k_way(self):
+        """
+        Tests merging several sorted per-charger interval lists.
+        Expected: overlapping and touching intervals across lists are combined in time order.
+        """
+        interval_lists = [
+            [(0, 10), (20, 30), (50, 60)],
+            [(5, 15), (30, 35)],
+            [],
+            [(40, 45), (60, 60), (70, 80)],
+        ]
+        self.assertEqual(list(station_uptime._merge_intervals(interval_lists)),
+                         [(0, 15), (20, 35), (40, 45), (50, 60), (70, 80)])
+        self.assertEqual(list(station_uptime._merge_intervals([])), [])
+
+    @unittest.skipUnless(station_uptime.np is not None, "NumPy is not installed")
+    def test_vectorized_matches_pure_python(self):
+        """
+        Tests the NumPy engine against the pure-Python calculation on random inputs
+        with overlapping, touching, zero-duration and out-of-order reports.
+        Expected: identical results for both report stores and the incremental mode.
+        """
+        rng = random.Random(42)
+        for _ in range(300):
+            stations, reports = self.random_topology(rng, 40)
+            expected = self.build_calculator(stations, reports).calculate_station_uptime()
+            for options in STORE_OPTIONS:
+                vectorized = self.build_calculator(stations, reports, VectorizedUptimeCalculator, **options)
+                self.assertEqual(vectorized.calculate_station_uptime(), expected)
+
+    def test_vectorized_fallback(self):
+        """
+        Tests that the vectorized calculator falls back to pure Python when NumPy
+        is missing or times exceed its int64 encoding.
+        Expected: the regular results in both cases.
+        """
+        input_content = f"""[Stations]
+0 1000
+1 1001
+
+[Charger Availability Reports]
+1000 0 50 true
+1000 75 100 true
+1001 {2 ** 62} {2 ** 62 + 100} true"""
+        
+        input_file = self.create_temp_file(input_content)
+        calculator = VectorizedUptimeCalculator()
+        calculator.parse_input_file(input_file)
+        self.assertEqual(calculator.calculate_station_uptime(), [(0, 75), (1, 100)])
+        with mock.patch.object(station_uptime, 'np', None):
+            self.assertEqual(calculator.calculate_station_uptime(), [(0, 75), (1, 100)])
+
+    def test_bucketed_unit_width_matches_exact(self):
+        """
+        Tests bitmap uptime with 1-unit buckets against the exact calculation on
+        random inputs.
+        Expected: identical results.
+        """
+        rng = random.Random(7)
+        for _ in range(300):
+            calculator = self.build_calculator(*self.random_topology(rng, 40))
+            self.assertEqual(calculator.calculate_station_uptime_bucketed(1), calculator.calculate_station_uptime())
+
+    def test_bucketed_coarse_width(self):
+        """
+        Tests bitmap uptime with buckets wider than one time unit.
+        Expected: buckets sampled at multiples of the width; spans without a
+        bucket time fall back to the exact uptime; non-positive widths rejected.
+        """
+        calculator = StationUptimeCalculator()
+        calculator.station_chargers = {0: {1, 2}, 1: {3}}
+        calculator._add_report(1, 0, 35, True)      # Buckets 0-3 up
+        calculator._add_report(2, 60, 100, True)    # Buckets 6-9 up
+        calculator._add_report(3, 11, 19, True)     # No bucket time within the span
+        self.assertEqual(calculator.calculate_station_uptime_bucketed(10), [(0, 80), (1, 100)])
+        with self.assertRaises(ValueError):
+            calculator.calculate_station_uptime_bucketed(0)
+
+    def test_coverage_bitmap_chunks(self):
+        """
+        Tests CoverageBitmap ranges spanning chunks and OR-ing of bitmaps.
+        Expected: whole chunks collapse to the FULL marker and counts are exact.
+        """
+        size = CoverageBitmap.CHUNK_SIZE
+        first = CoverageBitmap()
+        first.add_range(10, 2 * size + 5)
+        self.assertEqual(first.chunks[1], CoverageBitmap.FULL)
+        self.assertEqual(first.count(), 2 * size - 5)
+        
+        second = CoverageBitmap()
+        second.add_range(0, 20)
+        second.add_range(3 * size, 3 * size + 1)
+        first |= second
+        self.assertEqual(first.chunks[0], CoverageBitmap.FULL)
+        self.assertEqual(first.count(), 2 * size + 6)
+
+    def test_bucketed_bitmaps_invalidated(self):
+        """
+        Tests that cached charger bitmaps are dropped when reports are added.
+        Expected: the second calculation reflects the new report.
+        """
+        calculator = StationUptimeCalculator()
+        calculator.station_chargers = {0: {1}}
+        calculator._add_report(1, 0, 100, True)
+        calculator._add_report(1, 100, 200, False)
+        self.assertEqual(calculator.calculate_station_uptime_bucketed(10), [(0, 50)])
+        self.assertIn(10, calculator.charger_bitmaps)
+        
+        calculator._add_reports(1, [100], [200], [True])
+        self.assertEqual(calculator.charger_bitmaps, {})
+        self.assertEqual(calculator.calculate_station_uptime_bucketed(10), [(0, 50)])
+        calculator._add_report(1, 150, 200, True)
+        self.assertEqual(calculator.calculate_station_uptime_bucketed(10), [(0, 75)])
+    def test_stations_up_at_matches_brute_force(self):
+        """
+        Tests point queries against a scan of each station's merged intervals on
+        random inputs, including query times at interval boundaries.
+        Expected: the same stations for every queried time.
+        """
+        rng = random.Random(11)
+        for _ in range(100):
+            calculator = self.build_calculator(*self.random_topology(
+                rng, 60, max_chargers=8, max_stations=10, max_reports=40, up_probability=0.7))
+            calculator.calculate_station_uptime()
+            for time in range(-1, 62):
+                expected = [station_id for station_id, intervals in sorted(calculator.station_intervals.items())
+                            if any(start <= time < end for start, end in intervals)]
+                self.assertEqual(calculator.stations_up_at(time), expected)
+
+    def test_stations_up_at(self):
+        """
+        Tests point queries on the sample input and after new reports arrive.
+        Expected: half-open intervals; retained intervals dropped on new reports.
+        """
+        calculator = StationUptimeCalculator()
+        calculator.parse_input_file(EXAMPLE_INPUT)
+        self.assertEqual(calculator.stations_up_at(0), [0, 2])
+        self.assertEqual(calculator.stations_up_at(50000), [0])
+        self.assertEqual(calculator.stations_up_at(100000), [2])
+        self.assertEqual(calculator.stations_up_at(200000), [])
+        self.assertEqual(calculator.station_intervals[1], [])
+        
+        calculator._add_report(1003, 100000, 120000, True)
+        self.assertIsNone(calculator.station_intervals)
+        self.assertEqual(calculator.stations_up_at(100000), [1, 2])
+
+    def test_window_uptime_matches_brute_force(self):
+        """
+        Tests prefix-sum window queries against clipping each merged interval to
+        the window, on random inputs and windows.
+        Expected: the same up time and percentage for every window.
+        """
+        rng = random.Random(13)
+        for _ in range(100):
+            calculator = self.build_calculator(*self.random_topology(rng, 60, max_reports=30, up_probability=0.7))
+            calculator.calculate_station_uptime()
+            for station_id, intervals in calculator.station_intervals.items():
+                for _ in range(20):
+                    window_start = rng.randint(-5, 60)
+                    window_end = rng.randint(window_start + 1, 66)
+                    up_time = sum(max(0, min(end, window_end) - max(start, window_start)) for start, end in intervals)
+                    self.assertEqual(calculator.uptime(station_id, window_start, window_end),
+                                     int((up_time / (window_end - window_start)) * 100))
+
+    def test_window_uptime(self):
+        """
+        Tests window queries on the sample input.
+        Expected: uptime relative to the window; invalid queries rejected.
+        """
+        calculator = StationUptimeCalculator()
+        calculator.parse_input_file(EXAMPLE_INPUT)
+        self.assertEqual(calculator.uptime(2, 0, 200000), 75)
+        self.assertEqual(calculator.uptime(2, 25000, 125000), 50)
+        self.assertEqual(calculator.uptime(0, 90000, 110000), 50)
+        with self.assertRaises(ValueError):
+            calculator.uptime(2, 100, 100)
+        with self.assertRaises(ValueError):
+            calculator.uptime(5, 0, 100)
+
+    def test_sweep_matches_unit_cells(self):
+        """
+        Tests the sweep, including its in-order tail fast paths, against a
+        unit-cell simulation of the sweep on random time-ordered and shuffled reports.
+        Expected: the same up cells.
+        """
+        rng = random.Random(17)
+        for _ in range(300):
+            rows, cursor = [], 0
+            for _ in range(rng.randint(0, 20)):
+                cursor += rng.randint(0, 5)
+                rows.append((cursor, cursor + rng.randint(0, 10), rng.random() < 0.6))
+            if rng.random() < 0.5:
+                rng.shuffle(rows)
+            
+            cells = set()
+            for start, end, is_up in sorted(rows, key=station_uptime._report_order):
+                if is_up:
+                    cells.update(range(start, end))
+                else:
+                    cells.difference_update(range(start, end))
+            intervals = station_uptime._sweep_charger_reports(list(rows)).intervals()
+            self.assertEqual({t for start, end in intervals for t in range(start, end)}, cells)
+
+    def test_engines_agree(self):
+        """
+        Tests every registered engine against the reference engine on random
+        inputs with overlapping, touching, zero-duration and out-of-order reports.
+        Expected: no station differs for any engine, report store or mode.
+        """
+        rng = random.Random(19)
+        for _ in range(200):
+            stations, reports = self.random_topology(rng, 40)
+            for options in STORE_OPTIONS:
+                calculator = self.build_calculator(stations, reports, engine='reference', **options)
+                for name in station_uptime.ENGINES:
+                    self.assertEqual(calculator.verify_engine(name), [])
+
+    def test_verify_engine_reports_mismatches(self):
+        """
+        Tests that verify_engine lists the stations on which two engines differ,
+        and that unknown engine names and engines without calculate are rejected.
+        Expected: (station_id, selected result, other result) per differing station.
+        """
+        class HalfEngine(station_uptime.UptimeEngine):
+            def calculate(self, calculator):
+                return [(station_id, uptime // 2)
+                        for station_id, uptime in station_uptime.SweepEngine().calculate(calculator)]
+        
+        calculator = StationUptimeCalculator()
+        calculator.parse_input_file(EXAMPLE_INPUT)
+        self.assertEqual(calculator.verify_engine(HalfEngine()), [(0, 100, 50), (2, 75, 37)])
+        with self.assertRaises(ValueError):
+            StationUptimeCalculator(engine='quantum')
+        with self.assertRaises(TypeError):
+            station_uptime.UptimeEngine()
+
+    def test_cli_engine_and_verify_combinations(self):
+        """
+        Tests that --engine is rejected where the output ignores it, and that
+        --verify also checks the results behind point queries and series.
+        Expected: ValueError for ignored engines; exit status 1 on a mismatch.
+        """
+        with self.assertRaises(ValueError):
+            station_uptime._parse_args(['--engine', 'vectorized', '--window', '0', '10', 'input'])
+        with self.assertRaises(ValueError):
+            station_uptime._parse_args(['--engine', 'reference', '--up-at', '5', 'input'])
+        self.assertEqual(station_uptime._parse_args(['--engine', 'sweep', '--worst', '2', 'input']).worst, 2)
+        
+        wrong = [(0, 0), (1, 0), (2, 0)]
+        for mode in (['--up-at', '10'], ['--series', '50000'], ['--rolling', '100000', '50000']):
+            argv = ['station_uptime.py'] + mode + ['--verify', 'reference', EXAMPLE_INPUT]
+            with mock.patch.object(sys, 'argv', argv), \
+                    mock.patch.object(station_uptime.ReferenceEngine, 'calculate', return_value=wrong), \
+                    mock.patch('sys.stdout', new_callable=io.StringIO), \
+                    mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+                with self.assertRaises(SystemExit) as raised:
+                    station_uptime.main()
+            self.assertEqual(raised.exception.code, 1)
+            self.assertIn("MISMATCH 0 sweep=100 reference=0", stderr.getvalue())
+
+    def test_windowed_uptime_matches_window_queries(self):
+        """
+        Tests windowed calculation against per-station window queries on random
+        inputs, for both report stores and the incremental mode.
+        Expected: identical results for every window.
+        """
+        rng = random.Random(23)
+        for _ in range(100):
+            stations, reports = self.random_topology(rng, 60)
+            windows = [(start, rng.randint(start + 1, 70)) for start in rng.sample(range(-5, 65), 5)]
+            for options in STORE_OPTIONS:
+                calculator = self.build_calculator(stations, reports, **options)
+                for window_start, window_end in windows:
+                    expected = [(station_id, calculator.uptime(station_id, window_start, window_end))
+                                for station_id in sorted(stations)]
+                    self.assertEqual(calculator.calculate_station_uptime(window_start, window_end), expected)
+
+    def test_windowed_uptime_skips_chargers(self):
+        """
+        Tests that chargers whose reports lie outside the window are not swept,
+        that bounds follow new reports, and that invalid windows are rejected.
+        Expected: only overlapping chargers swept; uptime relative to the window.
+        """
+        calculator = StationUptimeCalculator()
+        calculator.station_chargers = {0: {1, 2}}
+        calculator._add_report(1, 0, 100, True)
+        calculator._add_report(2, 200, 300, True)
+        sweep = station_uptime._sweep_charger_reports
+        with mock.patch.object(station_uptime, '_sweep_charger_reports', side_effect=sweep) as counted:
+            self.assertEqual(calculator.calculate_station_uptime(50, 150), [(0, 50)])
+        self.assertEqual(counted.call_count, 1)
+        
+        calculator._add_report(2, 100, 125, True)
+        self.assertEqual(calculator.calculate_station_uptime(50, 150), [(0, 75)])
+        with self.assertRaises(ValueError):
+            calculator.calculate_station_uptime(50)
+        with self.assertRaises(ValueError):
+            calculator.calculate_station_uptime(150, 50)
+
+    def test_windows_reuse_timelines(self):
+        """
+        Tests that consecutive windows share charger timelines and bounds.
+        Expected: each charger is swept once across all windows until new reports arrive.
+        """
+        calculator = StationUptimeCalculator()
+        calculator.station_chargers = {0: {1, 2}}
+        calculator._add_report(1, 0, 100, True)
+        calculator._add_report(2, 50, 300, True)
+        sweep = station_uptime._sweep_charger_reports
+        with mock.patch.object(station_uptime, '_sweep_charger_reports', side_effect=sweep) as counted:
+            windows = [calculator.calculate_station_uptime(start, start + 100) for start in range(0, 300, 100)]
+        self.assertEqual(windows, [[(0, 100)], [(0, 100)], [(0, 100)]])
+        self.assertEqual(counted.call_count, 2)
+
+    def test_invalidate_caches_after_direct_changes(self):
+        """
+        Tests that invalidate_caches makes every query see reports appended to
+        charger_reports directly, for both the plain and the incremental mode.
+        Expected: windows, window queries, point queries and series agree with a fresh calculator.
+        """
+        for incremental in (False, True):
+            calculator = StationUptimeCalculator(incremental=incremental)
+            calculator.parse_input_file(EXAMPLE_INPUT)
+            self.assertEqual(calculator.calculate_station_uptime(0, 100000)[1], (1, 0))
+            self.assertEqual(calculator.stations_up_at(150000), [2])
+            
+            calculator.charger_reports[1003].append(ChargerReport(1003, 100000, 200000, True))
+            calculator.invalidate_caches()
+            self.assertEqual(calculator.calculate_station_uptime(100000, 200000)[1], (1, 100))
+            self.assertEqual(calculator.uptime(1, 100000, 200000), 100)
+            self.assertEqual(calculator.stations_up_at(150000), [1, 2])
+            self.assertEqual(dict(calculator.calculate_uptime_series(100000))[1], [0, 100])
+
+    def test_uptime_series_matches_windows(self):
+        """
+        Tests the single-pass series against one windowed calculation per bucket
+        on random inputs and ranges.
+        Expected: identical per-bucket uptimes, the last bucket cut at the range end.
+        """
+        rng = random.Random(29)
+        for _ in range(100):
+            calculator = self.build_calculator(*self.random_topology(rng, 60))
+            bucket_width = rng.randint(1, 15)
+            series_start, series_end = rng.randint(-10, 30), rng.randint(31, 80)
+            
+            windows = [calculator.calculate_station_uptime(start, min(start + bucket_width, series_end))
+                       for start in range(series_start, series_end, bucket_width)]
+            expected = [(station_id, [window[i][1] for window in windows])
+                        for i, station_id in enumerate(sorted(calculator.station_chargers))]
+            self.assertEqual(calculator.calculate_uptime_series(bucket_width, series_start, series_end), expected)
+
+    def test_uptime_series(self):
+        """
+        Tests the series on the sample input.
+        Expected: buckets from the earliest start; width validated.
+        """
+        calculator = StationUptimeCalculator()
+        calculator.parse_input_file(EXAMPLE_INPUT)
+        self.assertEqual(calculator.calculate_uptime_series(50000),
+                         [(0, [100, 100, 0, 0]), (1, [0, 0, 0, 0]), (2, [100, 0, 100, 100])])
+        self.assertEqual(calculator.calculate_uptime_series(30000, 0, 100000)[2], (2, [100, 66, 0, 0]))
+        self.assertEqual(calculator.calculate_uptime_series(10, 5, 5)[0], (0, []))
+        with self.assertRaises(ValueError):
+            calculator.calculate_uptime_series(0)
+
+    def test_rolling_uptime_matches_windows(self):
+        """
+        Tests the rolling series against one windowed calculation per window on
+        random inputs, with steps shorter and longer than the window.
+        Expected: identical per-window uptimes.
+        """
+        rng = random.Random(31)
+        for _ in range(100):
+            calculator = self.build_calculator(*self.random_topology(rng, 60))
+            window, step = rng.randint(1, 30), rng.randint(1, 40)
+            series_start, series_end = rng.randint(-10, 30), rng.randint(20, 80)
+            
+            windows = [calculator.calculate_station_uptime(start, start + window)
+                       for start in range(series_start, series_end - window + 1, step)]
+            expected = [(station_id, [result[i][1] for result in windows])
+                        for i, station_id in enumerate(sorted(calculator.station_chargers))]
+            self.assertEqual(calculator.calculate_rolling_uptime(window, step, series_start, series_end), expected)
+
+    def test_rolling_uptime(self):
+        """
+        Tests the rolling series on the sample input.
+        Expected: full windows only, from the earliest start; arguments validated.
+        """
+        calculator = StationUptimeCalculator()
+        calculator.parse_input_file(EXAMPLE_INPUT)
+        self.assertEqual(calculator.calculate_rolling_uptime(100000, 25000),
+                         [(0, [100, 75, 50, 25, 0]), (1, [0, 0, 0, 0, 0]), (2, [50, 50, 50, 75, 100])])
+        self.assertEqual(calculator.calculate_rolling_uptime(300000, 1)[0], (0, []))
+        with self.assertRaises(ValueError):
+            calculator.calculate_rolling_uptime(100, 0)
+
+    def test_worst_and_best_match_sorted_results(self):
+        """
+        Tests worst(k) and best(k) against sorting the full results on random inputs.
+        Expected: the same stations in the same order, ties broken by station ID.
+        """
+        rng = random.Random(37)
+        for _ in range(200):
+            calculator = self.build_calculator(*self.random_topology(rng, 40, max_stations=10, id_space=20))
+            results = calculator.calculate_station_uptime()
+            k = rng.randint(0, 12)
+            self.assertEqual(calculator.worst(k), sorted(results, key=lambda r: (r[1], r[0]))[:k])
+            self.assertEqual(calculator.best(k), sorted(results, key=lambda r: (-r[1], r[0]))[:k])
+
+    def test_worst_prunes_stations(self):
+        """
+        Tests that stations whose uptime bound cannot reach the top k are not merged.
+        Expected: only the stations that may rank are calculated; negative k rejected.
+        """
+        calculator = StationUptimeCalculator()
+        calculator.station_chargers = {0: {1}, 1: {2}, 2: {3, 4}}
+        calculator._add_report(1, 0, 100, False)
+        calculator._add_report(2, 0, 100, True)
+        calculator._add_report(3, 0, 50, True)
+        calculator._add_report(4, 25, 100, True)
+        station = station_uptime.SweepEngine.station_uptime
+        with mock.patch.object(station_uptime.SweepEngine, 'station_uptime', autospec=True,
+                               side_effect=station) as merged:
+            self.assertEqual(calculator.worst(1), [(0, 0)])
+        self.assertEqual(merged.call_count, 1)
+        self.assertEqual(calculator.best(2), [(1, 100), (2, 100)])
+        with self.assertRaises(ValueError):
+            calculator.worst(-1)
+
+    def test_charger_uptime_matches_single_charger_stations(self):
+        """
+        Tests charger uptimes against stations holding just that charger, on
+        random inputs for both report stores and the incremental mode.
+        Expected: identical percentages.
+        """
+        rng = random.Random(41)
+        for _ in range(100):
+            reports = self.random_reports(rng, 5, 40)
+            for options in STORE_OPTIONS:
+                stations = {charger_id: {charger_id} for charger_id in range(4)}
+                calculator = self.build_calculator(stations, reports, **options)
+                self.assertEqual(calculator.calculate_charger_uptime(), calculator.calculate_station_uptime())
+
+    def test_charger_uptime_reuses_timelines(self):
+        """
+        Tests that charger uptimes after a station calculation reuse its timelines.
+        Expected: per-charger results on the sample input without another sweep.
+        """
+        calculator = StationUptimeCalculator()
+        calculator.parse_input_file(EXAMPLE_INPUT)
+        calculator.calculate_station_uptime()
+        with mock.patch.object(station_uptime, '_sweep_charger_reports') as sweep:
+            self.assertEqual(calculator.calculate_charger_uptime(),
+                             [(1001, 100), (1002, 100), (1003, 0), (1004, 75)])
+        sweep.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file